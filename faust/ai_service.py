@@ -7,6 +7,31 @@ from rich.console import Console
 from .config import get_config
 from .math_renderer import get_math_renderer
 
+# Display information for each academic level, built once
+_LEVEL_INFO = {
+    'child': {
+        'name': 'Child Mode',
+        'description': 'Elementary/Middle School (Under 16)',
+        'complexity': 'Basic',
+        'topics': ['Arithmetic', 'Basic Geometry', 'Introduction to Algebra', 'Fractions'],
+        'teaching_style': 'Patient, encouraging, with simple explanations'
+    },
+    'normal': {
+        'name': 'Normal Mode', 
+        'description': 'High School Level (Default)',
+        'complexity': 'Intermediate',
+        'topics': ['Algebra', 'Geometry', 'Trigonometry', 'Pre-Calculus', 'Statistics'],
+        'teaching_style': 'Balanced rigor with clear explanations'
+    },
+    'academic': {
+        'name': 'Academic Mode',
+        'description': 'College to PhD Level',
+        'complexity': 'Advanced',
+        'topics': ['Advanced Calculus', 'Abstract Algebra', 'Real Analysis', 'Research Mathematics'],
+        'teaching_style': 'Rigorous, theoretical, with academic depth'
+    }
+}
+
 class FaustAI:
     """AI service for Faust Math Teacher"""
     
@@ -422,32 +447,8 @@ Respond with just the summary, no additional commentary."""
         return random.choice(starters)
     
     def get_academic_level_info(self, academic_level: str) -> Dict[str, Any]:
-        """Get information about a specific academic level"""
-        level_info = {
-            'child': {
-                'name': 'Child Mode',
-                'description': 'Elementary/Middle School (Under 16)',
-                'complexity': 'Basic',
-                'topics': ['Arithmetic', 'Basic Geometry', 'Introduction to Algebra', 'Fractions'],
-                'teaching_style': 'Patient, encouraging, with simple explanations'
-            },
-            'normal': {
-                'name': 'Normal Mode', 
-                'description': 'High School Level (Default)',
-                'complexity': 'Intermediate',
-                'topics': ['Algebra', 'Geometry', 'Trigonometry', 'Pre-Calculus', 'Statistics'],
-                'teaching_style': 'Balanced rigor with clear explanations'
-            },
-            'academic': {
-                'name': 'Academic Mode',
-                'description': 'College to PhD Level',
-                'complexity': 'Advanced',
-                'topics': ['Advanced Calculus', 'Abstract Algebra', 'Real Analysis', 'Research Mathematics'],
-                'teaching_style': 'Rigorous, theoretical, with academic depth'
-            }
-        }
-        
-        return level_info.get(academic_level, level_info['normal'])
+        """Get information about a specific academic level (shared dict, do not modify)"""
+        return _LEVEL_INFO.get(academic_level, _LEVEL_INFO['normal'])
     
     def _extract_chat_history(self, chat_session) -> List[Dict[str, Any]]:
         """Extract chat history from Gemini chat session"""
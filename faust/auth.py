@@ -280,9 +280,13 @@ class TerminalAuth:
                     self.console.print("[bright_red]✗ Invalid username or password[/bright_red]")
                     return False
                 
+                # Move older accounts over to the current password hash
+                if user.password_needs_rehash():
+                    user.set_password(password)
+                
                 # Update last login
                 user.last_login = datetime.utcnow()
-                user.last_active = datetime.utcnow()
+                user.last_active = user.last_login
                 session.commit()
                 
                 # Set authentication state
@@ -454,7 +458,7 @@ class TerminalAuth:
             
             # Get fresh user data from database
             with self.database.get_session() as db_session:
-                user = db_session.query(User).filter(User.id == user_id).first()
+                user = db_session.get(User, user_id)
                 if not user or not user.is_active:
                     self._clear_session()
                     return False
@@ -559,7 +563,7 @@ class TerminalAuth:
             
             # Update password in database
             with self.database.get_session() as session:
-                user = session.query(User).filter(User.id == self.current_user['id']).first()
+                user = session.get(User, self.current_user['id'])
                 if not user or not user.check_password(current_password):
                     self.console.print("[bright_red]✗ Current password is incorrect[/bright_red]")
                     return False
@@ -1,54 +1,205 @@
 import sys
+import atexit
 import os
 import signal
 import time
 import random
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+import queue
+import threading
+from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
 import click
 from rich.console import Console
-from rich.prompt import Prompt, Confirm
+from rich.prompt import Confirm
 from rich.text import Text
-from rich.live import Live
-from rich.table import Table
-from rich.panel import Panel
+from rich.errors import MarkupError
+from rich.control import Control
+from rich.cells import cell_len
 
 from .config import get_config
 from .auth import get_auth
-from .session_manager import create_session_manager
-from .ai_service import get_ai_service
 from .math_renderer import get_math_renderer
 
+if TYPE_CHECKING:
+    from rich.live import Live
+
+try:
+    import readline
+except ImportError:  # Not available on Windows
+    readline = None
+
+# Maximum number of prompt lines kept in the history file
+_HISTORY_LENGTH = 1000
+
+# Static UI text, parsed once at import
+_HELP_TEXT = Text.from_markup("\n".join([
+    "",
+    "[white]Available commands:[/white]",
+    "  [white]Basic Commands:[/white]",
+    "    /help           - Show this help",
+    "    /clear          - Clear screen",
+    "    /info           - Show session information",
+    "    /quit           - Exit application",
+    "",
+    "  [white]Session Management:[/white]",
+    "    /new \\[title]    - Start new conversation",
+    "    /history        - Show recent messages",
+    "    /sessions       - Show all conversations",
+    "    /load <id>      - Load conversation by session ID",
+    "",
+    "  [white]Academic Level Control:[/white]",
+    "    /level          - Show current academic level",
+    "    /level list     - Show all available levels",
+    "    /level set <level>  - Set academic level (child/normal/academic)",
+    "    /level set <level> --session-only  - Set level for current session only",
+    "",
+    "  [white]Account:[/white]",
+    "    /logout         - End session",
+    "",
+    "[dim]Just type your math question to chat with Faust[/dim]",
+    "[dim]Faust adapts her explanations based on your academic level[/dim]",
+    "",
+]))
+
+_LEVELS_PANEL_TITLE = Text.from_markup("[white]AVAILABLE ACADEMIC LEVELS[/white]")
+_SESSION_PANEL_TITLE = Text.from_markup("[white]CURRENT SESSION INFO[/white]")
+
+# Academic levels in display order
+_ACADEMIC_LEVELS = ('child', 'normal', 'academic')
+
+# Typewriter timing: a fixed delay per word, longer pauses (drawn from these) after punctuation
+_TYPING_DELAY = 0.04
+_STREAM_PAUSES = tuple(0.1 + 0.01 * i for i in range(21))  # 0.1-0.3s
+_MESSAGE_PAUSES = tuple(0.1 + 0.01 * i for i in range(11))  # 0.1-0.2s
+
+# Response chunks buffered between the fetching thread and the display
+_CHUNK_QUEUE_SIZE = 128
+_CHUNK_PUT_TIMEOUT = 0.1  # seconds between checks that the display is still reading
+
+# Faust's reactions to an academic level change
+_LEVEL_REACTIONS = {
+    'child': (
+        "Oh! Well, I suppose I should adjust my explanations for a younger student. Don't worry, I'll be... gentler with the mathematical concepts.",
+        "I see we're switching to a more elementary approach. Very well, I can work with students of all ages... though I do hope you'll still appreciate the beauty of mathematics!",
+        "Hmph, fine. I'll use simpler language, but the mathematical rigor remains the same! Mathematics is mathematics, regardless of age."
+    ),
+    'normal': (
+        "Ah, back to the standard level. This is... comfortable territory for most students. We can cover proper high school mathematics now.",
+        "Good, we're at a reasonable academic level. I can provide appropriately challenging explanations without overwhelming you.",
+        "Normal mode it is. Perfect for building solid mathematical foundations... which you'll need if you want to advance further."
+    ),
+    'academic': (
+        "Excellent! Finally, someone ready for serious mathematical discourse. I can use proper notation and advanced concepts without holding back.",
+        "Academic level, I see. Good. Now we can engage in real mathematical analysis without... dumbing things down unnecessarily.",
+        "Perfect. I was getting tired of oversimplifying everything. Let's discuss mathematics at the level it deserves to be discussed."
+    )
+}
+
+_DEFAULT_REACTION = ("Level changed. Let's continue with our mathematical discussion.",)
+
+# Status lines shown while waiting for a response
+_THINKING_MESSAGES = (
+    "Faust is thinking...",
+    "Faust is analyzing...",
+    "Faust is processing...",
+    "Faust is calculating...",
+)
+
+def _needs_rich(text: str) -> bool:
+    """Check whether text may contain markup or math that Rich has to render"""
+    return '[' in text or '$' in text or '\\' in text
+
+def _typing_delays(words: List[str], pauses: Tuple[float, ...]) -> List[float]:
+    """Typewriter delay for each word, drawing every punctuation pause in one call"""
+    drawn = random.choices(pauses, k=len(words))
+    return [
+        pause if word.rstrip(' ')[-1:] in ('.', ',', '!', '?') else _TYPING_DELAY
+        for word, pause in zip(words, drawn)
+    ]
+
+def _trunc(text: str, limit: int) -> str:
+    """Shorten text to at most limit characters, ending in an ellipsis if cut"""
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def _iso_minutes(iso: str) -> str:
+    """Format an ISO timestamp as 'YYYY-MM-DD HH:MM' by slicing, without parsing it"""
+    return iso[:10] + " " + iso[11:16]
+
+class _StreamDisplay:
+    """Live renderable showing the latest streamed markup, parsed when Live refreshes"""
+    
+    def __init__(self, prefix: Text):
+        self.prefix = prefix
+        self.markup = ""
+    
+    def __rich__(self) -> Text:
+        # Runs on Live's refresh thread, so stray markup must not raise
+        try:
+            body = Text.from_markup(self.markup, style="white")
+        except MarkupError:
+            body = Text(self.markup, style="white")
+        return self.prefix + body
+
 class FaustCLI:
     """Natural chat interface for Faust"""
     
+    # Slash command -> handler method, each taking the split command line
+    _COMMANDS = {
+        '/help': '_show_help',
+        '/quit': '_quit',
+        '/exit': '_quit',
+        '/clear': '_clear_screen',
+        '/new': '_handle_new_session_command',
+        '/history': '_show_simple_history',
+        '/sessions': '_show_simple_sessions',
+        '/load': '_handle_load_session',
+        '/level': '_handle_academic_level_command',
+        '/info': '_show_session_info',
+        '/logout': '_logout',
+    }
+    
     def __init__(self):
         self.config = get_config()
         self.auth = get_auth()
         self.console = Console()
         self.session_manager = None
         self.ai_service = None
+        self._level_info: Dict[str, Dict[str, Any]] = {}
         self.math_renderer = get_math_renderer()
         
         # Application state
         self.running = False
+        self.typewriter = os.environ.get('FAUST_TYPEWRITER') == '1'
+        
+        # Line-buffer stdout so console writes go out once per line (Windows consoles default to unbuffered)
+        if hasattr(sys.stdout, 'reconfigure'):
+            sys.stdout.reconfigure(line_buffering=True, write_through=False)
         
-        # Set up signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        # Prompt styled once with raw ANSI; readline needs the escapes marked as zero-width
+        self._at_prompt = False
+        if readline is not None and self.console.is_terminal:
+            self._prompt_str = "\001\x1b[37m\002You:\001\x1b[0m\002 "
+        else:
+            self._prompt_str = "You: "
+        
+        # Write out any unsaved messages on exit
+        atexit.register(self._flush_saves)
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully"""
         self.console.print("\n[dim]Connection terminated.[/dim]")
         self.running = False
+        # Queued saves are flushed by the atexit hook; waiting on the writer here
+        # could block inside the signal handler
+        
+        # At the prompt, break out of input() and let the conversation loop wind down
+        if self._at_prompt:
+            raise EOFError
         sys.exit(0)
     
     def start(self):
         """Start the Faust CLI application"""
-        self.console.clear()
-        
         try:
-            # Authentication
+            # Authentication (the welcome screen clears the terminal itself)
             if not self.auth.show_welcome_screen():
                 return
             
@@ -75,16 +226,25 @@ class FaustCLI:
         
         self.console.print("[dim]Establishing connection...[/dim]")
         
+        # Imported here so --help/--version don't pay for loading the Gemini SDK
+        from .ai_service import get_ai_service
+        from .session_manager import create_session_manager
+        
         # Initialize AI service
         self.ai_service = get_ai_service()
         
+        # Level descriptions are static, so look them up once
+        self._level_info = {
+            level: self.ai_service.get_academic_level_info(level) for level in _ACADEMIC_LEVELS
+        }
+        
         # Initialize session manager
         self.session_manager = create_session_manager(user['id'])
         
         # Load or create default session
-        sessions = self.session_manager.list_sessions(1)
-        if sessions:
-            self.session_manager.load_session(sessions[0]['session_id'])
+        latest_session_id = self.session_manager.get_latest_session_id()
+        if latest_session_id:
+            self.session_manager.load_session(latest_session_id)
         else:
             self.session_manager.create_new_session("Math Discussion")
         
@@ -100,7 +260,7 @@ class FaustCLI:
         
         # Show current academic level
         current_level = self.session_manager.get_current_academic_level()
-        level_info = self.ai_service.get_academic_level_info(current_level)
+        level_info = self._level_info.get(current_level, self._level_info['normal'])
         self.console.print(f"[bright_black]Academic Level: {level_info['name']}[/bright_black]")
         self.console.print()
         
@@ -120,11 +280,16 @@ class FaustCLI:
     def _conversation_loop(self):
         """Main conversation loop"""
         self.running = True
+        self._setup_readline()
         
         while self.running:
             try:
                 # Simple prompt
-                user_input = Prompt.ask("[white]You[/white]", show_default=False)
+                self._at_prompt = True
+                try:
+                    user_input = input(self._prompt_str)
+                finally:
+                    self._at_prompt = False
                 
                 if not user_input.strip():
                     continue
@@ -143,38 +308,62 @@ class FaustCLI:
             except Exception as e:
                 self.console.print(f"[bright_red]Error: {e}[/bright_red]")
     
+    def _setup_readline(self):
+        """Load prompt history from the app directory and save it again on exit"""
+        if readline is None:
+            return
+        
+        history_file = self.config.app_dir / 'history'
+        
+        # Drop anything typed during login so only chat input is remembered
+        # (clear_history is missing from some readline/libedit builds)
+        if hasattr(readline, 'clear_history'):
+            readline.clear_history()
+        readline.set_history_length(_HISTORY_LENGTH)
+        try:
+            readline.read_history_file(history_file)
+        except OSError:
+            pass
+        
+        atexit.register(self._save_readline_history, history_file)
+    
+    def _save_readline_history(self, history_file):
+        """Write prompt history, ignoring an unwritable app directory"""
+        try:
+            readline.write_history_file(history_file)
+        except OSError:
+            pass
+    
     def _handle_command(self, command: str):
         """Enhanced command handler with academic level commands"""
+        # Commands may read or switch sessions, so persist the conversation first
+        self._flush_saves()
+        
         cmd_parts = command.strip().split()
         cmd = cmd_parts[0].lower()
         
-        if cmd == '/help':
-            self._show_help()
-        elif cmd == '/quit' or cmd == '/exit':
-            self.console.print("\n[dim]Faust: Until next time.[/dim]")
-            self.running = False
-        elif cmd == '/clear':
-            self.console.clear()
-        elif cmd == '/new':
-            self._handle_new_session_command(cmd_parts)
-        elif cmd == '/history':
-            self._show_simple_history()
-        elif cmd == '/sessions':
-            self._show_simple_sessions()
-        elif cmd == '/load':
-            self._handle_load_session(cmd_parts)
-        elif cmd == '/level':
-            self._handle_academic_level_command(cmd_parts)
-        elif cmd == '/info':
-            self._show_session_info()
-        elif cmd == '/logout':
-            if Confirm.ask("End session?"):
-                self.auth.logout()
-                self.running = False
+        handler = self._COMMANDS.get(cmd)
+        if handler:
+            getattr(self, handler)(cmd_parts)
         else:
             self.console.print(f"[bright_red]Unknown command: {cmd}[/bright_red]")
             self.console.print("[dim]Type /help for available commands[/dim]")
     
+    def _quit(self, cmd_parts: List[str]):
+        """End the conversation"""
+        self.console.print("\n[dim]Faust: Until next time.[/dim]")
+        self.running = False
+    
+    def _clear_screen(self, cmd_parts: List[str]):
+        """Clear the terminal"""
+        self.console.clear()
+    
+    def _logout(self, cmd_parts: List[str]):
+        """Log out after confirmation"""
+        if Confirm.ask("End session?"):
+            self.auth.logout()
+            self.running = False
+    
     def _handle_new_session_command(self, cmd_parts: List[str]):
         """Handle creating new session with optional academic level"""
         title = "New Discussion"
@@ -255,7 +444,10 @@ class FaustCLI:
     
     def _show_available_levels(self):
         """Display all available academic levels"""
-        levels = ['child', 'normal', 'academic']
+        from rich.table import Table
+        from rich.panel import Panel
+        
+        current_level = self.session_manager.get_current_academic_level()
         
         table = Table(show_header=True, header_style="white", border_style="white", box=None)
         table.add_column("Level", style="white", width=12)
@@ -263,9 +455,9 @@ class FaustCLI:
         table.add_column("Complexity", style="cyan", width=12)
         table.add_column("Example Topics", style="dim", min_width=30)
         
-        for level in levels:
-            level_info = self.ai_service.get_academic_level_info(level)
-            current = " (current)" if level == self.session_manager.get_current_academic_level() else ""
+        for level in _ACADEMIC_LEVELS:
+            level_info = self._level_info[level]
+            current = " (current)" if level == current_level else ""
             
             table.add_row(
                 f"{level_info['name']}{current}",
@@ -276,41 +468,21 @@ class FaustCLI:
         
         panel = Panel.fit(
             table,
-            title="[white]AVAILABLE ACADEMIC LEVELS[/white]",
+            title=_LEVELS_PANEL_TITLE,
             border_style="white",
             padding=(1, 2)
         )
         self.console.print(panel)
-        self.console.print()
-        
-        self.console.print("[dim]Use '/level set <level>' to change academic level[/dim]")
-        self.console.print("[dim]Use '/level set <level> --session-only' to change for current session only[/dim]")
-        self.console.print()
+        self.console.print(
+            "\n[dim]Use '/level set <level>' to change academic level[/dim]\n"
+            "[dim]Use '/level set <level> --session-only' to change for current session only[/dim]\n"
+        )
     
     def _get_level_change_reaction(self, new_level: str) -> str:
         """Get Faust's reaction to academic level change"""
-        reactions = {
-            'child': [
-                "Oh! Well, I suppose I should adjust my explanations for a younger student. Don't worry, I'll be... gentler with the mathematical concepts.",
-                "I see we're switching to a more elementary approach. Very well, I can work with students of all ages... though I do hope you'll still appreciate the beauty of mathematics!",
-                "Hmph, fine. I'll use simpler language, but the mathematical rigor remains the same! Mathematics is mathematics, regardless of age."
-            ],
-            'normal': [
-                "Ah, back to the standard level. This is... comfortable territory for most students. We can cover proper high school mathematics now.",
-                "Good, we're at a reasonable academic level. I can provide appropriately challenging explanations without overwhelming you.",
-                "Normal mode it is. Perfect for building solid mathematical foundations... which you'll need if you want to advance further."
-            ],
-            'academic': [
-                "Excellent! Finally, someone ready for serious mathematical discourse. I can use proper notation and advanced concepts without holding back.",
-                "Academic level, I see. Good. Now we can engage in real mathematical analysis without... dumbing things down unnecessarily.",
-                "Perfect. I was getting tired of oversimplifying everything. Let's discuss mathematics at the level it deserves to be discussed."
-            ]
-        }
-        
-        import random
-        return random.choice(reactions.get(new_level, ["Level changed. Let's continue with our mathematical discussion."]))
+        return random.choice(_LEVEL_REACTIONS.get(new_level, _DEFAULT_REACTION))
     
-    def _show_session_info(self):
+    def _show_session_info(self, cmd_parts: List[str]):
         """Display current session and academic level information"""
         session_info = self.session_manager.get_current_session_info()
         
@@ -318,6 +490,9 @@ class FaustCLI:
             self.console.print("[dim]No active session. Start a conversation first.[/dim]")
             return
         
+        from rich.table import Table
+        from rich.panel import Panel
+        
         level_info = session_info['academic_level_info']
         
         table = Table(show_header=False, box=None, border_style="white")
@@ -331,15 +506,15 @@ class FaustCLI:
         table.add_row("Session ID", session_info['session_id'][:12] + "...")
         
         # Format timestamps
-        created = datetime.fromisoformat(session_info['created_at']).strftime("%Y-%m-%d %H:%M")
-        last_active = datetime.fromisoformat(session_info['last_active']).strftime("%Y-%m-%d %H:%M")
+        created = _iso_minutes(session_info['created_at'])
+        last_active = _iso_minutes(session_info['last_active'])
         
         table.add_row("Created", created)
         table.add_row("Last Active", last_active)
         
         panel = Panel.fit(
             table,
-            title="[white]CURRENT SESSION INFO[/white]",
+            title=_SESSION_PANEL_TITLE,
             border_style="white",
             padding=(1, 2)
         )
@@ -349,14 +524,7 @@ class FaustCLI:
     def _handle_chat_message(self, message: str):
         """Handle regular chat message with streaming"""
         # Show thinking indicators
-        thinking_messages = [
-            "Faust is thinking...",
-            "Faust is analyzing...",
-            "Faust is processing...",
-            "Faust is calculating..."
-        ]
-        
-        thinking_msg = random.choice(thinking_messages)
+        thinking_msg = random.choice(_THINKING_MESSAGES)
         
         # Show thinking with delay
         with self.console.status(f"[dim]{thinking_msg}[/dim]", spinner="dots"):
@@ -372,127 +540,237 @@ class FaustCLI:
     def _stream_faust_response(self, user_message: str):
         """Stream Faust's response naturally"""
         full_response = ""
-        response_display = Text()
+        pending = ""
+        live = None
+        display = None
+        rendered_tail = ""  # Math-rendered text shown by Live
+        carry = ""  # Streamed text not yet safe to render (open math expression)
+        
+        # Fetch on a background thread so typing and rendering don't hold up the network;
+        # stop tells it to give up once the display is no longer reading
+        chunks = queue.Queue(maxsize=_CHUNK_QUEUE_SIZE)
+        stop = threading.Event()
         
         try:
-            # Use Live for smooth streaming
-            with Live(response_display, console=self.console, refresh_per_second=15, transient=False) as live:
-                # Show "Faust:" label first
-                self.console.print("[white]Faust:[/white] ", end="")
+            # Session setup (and any new session) happens here; the thread only reads the stream
+            stream = self.session_manager.send_message_stream(user_message)
+            producer = threading.Thread(target=self._produce_chunks, args=(stream, chunks, stop), daemon=True)
+            
+            # Show "Faust:" label first
+            self.console.print("[white]Faust:[/white] ", end="")
+            producer.start()
+            
+            while True:
+                chunk_data = self._next_chunk(chunks)
+                if chunk_data is None:
+                    break
+                
+                # Typing for this chunk is paced against one monotonic schedule
+                deadline = time.monotonic()
+                
+                if chunk_data['is_complete']:
+                    # Flush the last partial word along with the final chunk
+                    pieces = [pending + chunk_data['chunk']]
+                elif self.typewriter:
+                    # Type word by word; the trailing piece may be a partial word
+                    pending += chunk_data['chunk']
+                    words = pending.split(' ')
+                    pending = words.pop()
+                    pieces = [word + ' ' for word in words]
+                else:
+                    pieces = [chunk_data['chunk']]
+                
+                if self.typewriter:
+                    delays = _typing_delays(pieces, _STREAM_PAUSES)
                 
-                for chunk_data in self.session_manager.send_message_stream(user_message):
-                    if chunk_data['chunk']:
-                        # Add each character with natural typing speed
-                        for char in chunk_data['chunk']:
-                            full_response += char
-                            
-                            # Render math and display
-                            rendered = self.math_renderer.render(full_response)
-                            response_display = Text.from_markup(rendered, style="white")
-                            
-                            live.update(response_display)
-                            
-                            # Variable typing speed for realism
-                            if char in '.,!?':
-                                time.sleep(random.uniform(0.1, 0.3))  # Pause at punctuation
-                            elif char == ' ':
-                                time.sleep(random.uniform(0.03, 0.08))  # Brief pause at spaces
-                            else:
-                                time.sleep(random.uniform(0.01, 0.05))  # Regular typing speed
+                for i, piece in enumerate(pieces):
+                    if live is None and not _needs_rich(piece):
+                        # Fast path: plain text goes straight to the terminal
+                        self._write_raw(piece)
+                    else:
+                        if live is None:
+                            live, display = self._start_live(full_response)
+                        
+                        # Render only the new text on top of what is already rendered;
+                        # Live picks it up on its next refresh
+                        rendered_tail, carry = self.math_renderer.render_incremental(rendered_tail, piece, carry)
+                        display.markup = rendered_tail + carry
                     
-                    if chunk_data['is_complete']:
-                        # Save to database
-                        if chunk_data.get('chat_history'):
-                            self.session_manager.chat_history = chunk_data['chat_history']
-                            self.session_manager._save_message_to_db(
-                                user_message, 
-                                full_response,
-                                chunk_data.get('tokens_used'), 
-                                chunk_data.get('response_time_ms')
-                            )
-                        break
+                    full_response += piece
+                    
+                    if self.typewriter:
+                        # Variable typing speed for realism, pausing at punctuation
+                        deadline += delays[i]
+                        
+                        # Time spent rendering counts towards the delay
+                        pause = deadline - time.monotonic()
+                        if pause > 0:
+                            time.sleep(pause)
+                
+                if chunk_data['is_complete']:
+                    # Render whatever math is still open; stopping Live draws the final response
+                    if live is not None:
+                        display.markup = rendered_tail + self.math_renderer.render(carry)
+                    
+                    # Hand off to the background writer
+                    if chunk_data.get('chat_history'):
+                        self.session_manager.chat_history = chunk_data['chat_history']
+                        self.session_manager.queue_exchange(
+                            user_message, 
+                            full_response,
+                            chunk_data.get('tokens_used'), 
+                            chunk_data.get('response_time_ms')
+                        )
+                    break
         
         except Exception as e:
             self.console.print(f"\n[bright_red]Faust: I'm having technical difficulties... {e}[/bright_red]")
         
+        finally:
+            stop.set()
+            if live is not None:
+                live.stop()
+        
         self.console.print()  # Add space after response
     
+    def _produce_chunks(self, stream, chunks: queue.Queue, stop: threading.Event):
+        """Pull response chunks from the AI stream into a queue, ending with None or the error raised"""
+        try:
+            for chunk_data in stream:
+                if not self._put_chunk(chunks, chunk_data, stop) or chunk_data['is_complete']:
+                    break
+        except Exception as e:
+            self._put_chunk(chunks, e, stop)
+        else:
+            self._put_chunk(chunks, None, stop)
+        finally:
+            # Release the AI service's response stream even when the display gave up early
+            stream.close()
+    
+    @staticmethod
+    def _put_chunk(chunks: queue.Queue, item, stop: threading.Event) -> bool:
+        """Queue an item, waiting for room only while the display is still reading"""
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=_CHUNK_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def _next_chunk(self, chunks: queue.Queue) -> Optional[Dict[str, Any]]:
+        """Wait for the next chunk and merge in any that have already arrived; None at the end"""
+        chunk_data = chunks.get()
+        
+        while isinstance(chunk_data, dict) and not chunk_data['is_complete']:
+            try:
+                following = chunks.get_nowait()
+            except queue.Empty:
+                break
+            
+            if not isinstance(following, dict):
+                # The end marker is always last, so it can go back for the next call
+                chunks.put(following)
+                break
+            chunk_data = dict(following, chunk=chunk_data['chunk'] + following['chunk'])
+        
+        if isinstance(chunk_data, Exception):
+            raise chunk_data
+        return chunk_data
+    
+    def _flush_saves(self):
+        """Wait for the background writer to store all completed exchanges"""
+        if self.session_manager:
+            self.session_manager.flush_writes()
+    
+    def _start_live(self, shown: str) -> Tuple['Live', _StreamDisplay]:
+        """Hand streaming over to Rich, redrawing the current line in place"""
+        from rich.live import Live
+        
+        line_start = shown.rfind('\n') + 1
+        
+        prefix = Text()
+        if line_start == 0:
+            prefix.append("Faust: ", style="white")
+        prefix.append(shown[line_start:], style="white")
+        
+        # Move back to where the current line began so Live overwrites it
+        rows = max(0, cell_len(prefix.plain) - 1) // self.console.width
+        self.console.control(Control.move_to_column(0, -rows))
+        
+        display = _StreamDisplay(prefix)
+        live = Live(display, console=self.console, refresh_per_second=15, transient=False)
+        live.start()
+        return live, display
+    
+    def _write_raw(self, text: str):
+        """Write plain text straight to stdout, bypassing Rich"""
+        stream = getattr(sys.stdout, 'buffer', None)
+        if stream is None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+        
+        stream.write(text.encode(sys.stdout.encoding or 'utf-8', errors='replace'))
+        stream.flush()
+    
     def _display_faust_message(self, message: str):
         """Display a static message from Faust with typing effect"""
         self.console.print("[white]Faust:[/white] ", end="")
         
         rendered_message = self.math_renderer.render(message)
         
-        # Simple typing effect for static messages
-        for char in rendered_message:
-            print(char, end="", flush=True)
-            if char in '.,!?':
-                time.sleep(random.uniform(0.1, 0.2))
-            elif char == ' ':
-                time.sleep(random.uniform(0.02, 0.05))
-            else:
-                time.sleep(random.uniform(0.01, 0.03))
+        if not self.typewriter:
+            # The trailing newline flushes the line-buffered stream
+            sys.stdout.write(rendered_message + "\n")
+            return
+        
+        # Simple word-by-word typing effect for static messages, paced against one schedule
+        words = rendered_message.split(" ")
+        delays = _typing_delays(words, _MESSAGE_PAUSES)
+        
+        deadline = time.monotonic()
+        for word, delay in zip(words, delays):
+            sys.stdout.write(word + " ")
+            sys.stdout.flush()
+            deadline += delay
+            
+            pause = deadline - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
         
         print()  # New line after message
     
-    def _show_help(self):
+    def _show_help(self, cmd_parts: List[str]):
         """Enhanced help with academic level commands"""
-        self.console.print()
-        self.console.print("[white]Available commands:[/white]")
-        self.console.print("  [white]Basic Commands:[/white]")
-        self.console.print("    /help           - Show this help")
-        self.console.print("    /clear          - Clear screen")
-        self.console.print("    /info           - Show session information")
-        self.console.print("    /quit           - Exit application")
-        self.console.print()
-        self.console.print("  [white]Session Management:[/white]")
-        self.console.print("    /new [title]    - Start new conversation")
-        self.console.print("    /history        - Show recent messages")
-        self.console.print("    /sessions       - Show all conversations")
-        self.console.print("    /load <id>      - Load conversation by session ID")
-        self.console.print()
-        self.console.print("  [white]Academic Level Control:[/white]")
-        self.console.print("    /level          - Show current academic level")
-        self.console.print("    /level list     - Show all available levels")
-        self.console.print("    /level set <level>  - Set academic level (child/normal/academic)")
-        self.console.print("    /level set <level> --session-only  - Set level for current session only")
-        self.console.print()
-        self.console.print("  [white]Account:[/white]")
-        self.console.print("    /logout         - End session")
-        self.console.print()
-        self.console.print("[dim]Just type your math question to chat with Faust[/dim]")
-        self.console.print("[dim]Faust adapts her explanations based on your academic level[/dim]")
-        self.console.print()
+        self.console.print(_HELP_TEXT)
     
-    def _show_simple_history(self):
+    def _show_simple_history(self, cmd_parts: List[str]):
         """Show recent conversation history"""
         if not self.session_manager.current_session_id:
             self.console.print("[dim]No active conversation[/dim]")
             return
         
-        history = self.session_manager.get_session_history(10)
+        history = self.session_manager.get_session_history(10, include_content=False)
         
         if not history:
             self.console.print("[dim]No message history[/dim]")
             return
         
-        self.console.print()
-        self.console.print("[white]Recent conversation:[/white]")
-        self.console.print()
+        lines = ["", "[white]Recent conversation:[/white]", ""]
         
         for msg in history[-5:]:  # Show last 5 messages
-            timestamp = datetime.fromisoformat(msg['timestamp']).strftime("%H:%M")
+            timestamp = msg['timestamp'][11:16]  # HH:MM
             speaker = "You" if msg['role'] == "user" else "Faust"
             
-            content = msg['content'][:100]
-            if len(msg['content']) > 100:
-                content += "..."
+            content = _trunc(msg['content_preview'], 100)
             
-            self.console.print(f"[dim]{timestamp}[/dim] [white]{speaker}:[/white] {content}")
+            lines.append(f"[dim]{timestamp}[/dim] [white]{speaker}:[/white] {content}")
         
-        self.console.print()
+        lines.append("")
+        self.console.print("\n".join(lines))
     
-    def _show_simple_sessions(self):
+    def _show_simple_sessions(self, cmd_parts: List[str]):
         """Show conversation sessions"""
         sessions = self.session_manager.list_sessions(10)
         
@@ -500,42 +778,44 @@ class FaustCLI:
             self.console.print("[dim]No conversations yet[/dim]")
             return
         
-        self.console.print()
-        self.console.print("[white]Your conversations:[/white]")
-        self.console.print()
+        lines = ["", "[white]Your conversations:[/white]", ""]
+        now = int(time.time())
         
         for i, session in enumerate(sessions, 1):
-            title = session['title'][:40]
-            if len(session['title']) > 40:
-                title += "..."
+            title = _trunc(session['title'], 40)
             
-            last_active = datetime.fromisoformat(session['last_active'])
-            time_diff = datetime.utcnow() - last_active
+            age = now - session['last_active_epoch']
             
-            if time_diff.days > 0:
-                time_str = f"{time_diff.days}d ago"
-            elif time_diff.seconds > 3600:
-                hours = time_diff.seconds // 3600
-                time_str = f"{hours}h ago"
+            if age >= 86400:
+                time_str = f"{age // 86400}d ago"
+            elif age > 3600:
+                time_str = f"{age // 3600}h ago"
             else:
-                minutes = time_diff.seconds // 60
-                time_str = f"{minutes}m ago"
+                time_str = f"{max(age, 0) // 60}m ago"
             
             current = " (current)" if session['session_id'] == self.session_manager.current_session_id else ""
             
-            self.console.print(f"  {i}. {title} - {session['message_count']} messages - {time_str}{current}")
-            self.console.print(f"     [dim]ID: {session['session_id']}[/dim]")
+            lines.append(f"  {i}. {title} - {session['message_count']} messages - {time_str}{current}")
+            lines.append(f"     [dim]ID: {session['session_id']}[/dim]")
         
-        self.console.print()
-        self.console.print("[dim]Use /load <session_id> to switch conversations[/dim]")
-        self.console.print()
+        lines.extend(["", "[dim]Use /load <session_id> to switch conversations[/dim]", ""])
+        self.console.print("\n".join(lines))
+
+def _install_signal_handlers(app: FaustCLI):
+    """Route shutdown signals to the app (signal handlers can only be set from the main thread)"""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    
+    signal.signal(signal.SIGINT, app._signal_handler)
+    signal.signal(signal.SIGTERM, app._signal_handler)
 
 # Click CLI interface
 @click.command()
 @click.version_option()
 @click.option('--debug', is_flag=True, help='Enable debug mode')
 @click.option('--config-dir', help='Custom configuration directory')
-def main(debug: bool, config_dir: Optional[str]):
+@click.option('--typewriter', is_flag=True, help='Type out responses word by word')
+def main(debug: bool, config_dir: Optional[str], typewriter: bool):
     """
     Faust - AI Math Teacher Terminal Application
     
@@ -551,8 +831,13 @@ def main(debug: bool, config_dir: Optional[str]):
         if debug:
             os.environ['FAUST_DEBUG'] = '1'
         
+        # Opt in to the typing effect
+        if typewriter:
+            os.environ['FAUST_TYPEWRITER'] = '1'
+        
         # Start the CLI application
         app = FaustCLI()
+        _install_signal_handlers(app)
         app.start()
         
     except KeyboardInterrupt:
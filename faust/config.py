@@ -1,14 +1,29 @@
 import os
 import json
+import atexit
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dotenv import load_dotenv
+
+def _read_small_file(path: Path) -> bytes:
+    """Read a small file as bytes, skipping the text I/O layer"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
 
 class Config:
     """Configuration manager for Faust application with context management"""
     
     def __init__(self):
         # Load environment variables
+        from dotenv import load_dotenv
         load_dotenv()
         
         # Set up paths
@@ -22,8 +37,13 @@ class Config:
         self.app_dir.mkdir(exist_ok=True)
         
         # Load configuration
+        self._last_saved_hash = None  # Hash of what config.json currently holds
         self.settings = self._load_config()
         
+        # Changes made through set() are written once, on save() or at exit
+        self._dirty = False
+        atexit.register(self.save)
+        
         # Environment variables with defaults
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
         self.jwt_secret_key = self._get_or_create_jwt_secret()
@@ -69,19 +89,24 @@ class Config:
             return default_config
         
         try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
-                # Merge with defaults (in case new settings were added)
-                return {**default_config, **config}
-        except (json.JSONDecodeError, IOError):
+            config = json.loads(_read_small_file(self.config_file))
+            self._last_saved_hash = hash(json.dumps(config, sort_keys=True))
+            # Merge with defaults (in case new settings were added)
+            return {**default_config, **config}
+        except (json.JSONDecodeError, UnicodeDecodeError, IOError):
             # If config is corrupted, use defaults
             return default_config
     
     def _save_config(self, config: Dict[str, Any]) -> None:
-        """Save configuration to file"""
+        """Save configuration to file, skipping the write if nothing changed"""
+        config_hash = hash(json.dumps(config, sort_keys=True))
+        if config_hash == self._last_saved_hash:
+            return
+        
         try:
             with open(self.config_file, 'w') as f:
                 json.dump(config, f, indent=2)
+            self._last_saved_hash = config_hash
         except IOError:
             # Fail silently if we can't save config
             pass
@@ -92,7 +117,7 @@ class Config:
         
         if secret_file.exists():
             try:
-                return secret_file.read_text().strip()
+                return _read_small_file(secret_file).strip().decode()
             except IOError:
                 pass
         
@@ -100,9 +125,13 @@ class Config:
         import secrets
         secret = secrets.token_urlsafe(32)
         
+        # Write to a private temp file and rename it into place so readers never see a partial secret
+        tmp_file = self.app_dir / f'.jwt_secret.{os.getpid()}.tmp'
         try:
-            secret_file.write_text(secret)
-            secret_file.chmod(0o600)  # Read-write for owner only
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)  # Read-write for owner only
+            with os.fdopen(fd, 'w') as f:
+                f.write(secret)
+            os.replace(tmp_file, secret_file)
         except IOError:
             pass
         
@@ -113,9 +142,15 @@ class Config:
         return self.settings.get(key, default)
     
     def set(self, key: str, value: Any) -> None:
-        """Set configuration value"""
+        """Set configuration value (persisted by save() or at exit)"""
         self.settings[key] = value
-        self._save_config(self.settings)
+        self._dirty = True
+    
+    def save(self) -> None:
+        """Write pending configuration changes to disk"""
+        if self._dirty:
+            self._save_config(self.settings)
+            self._dirty = False
     
     def get_context_settings(self, academic_level: str = 'normal') -> Dict[str, Any]:
         """Get context management settings for specific academic level"""
@@ -169,10 +204,13 @@ class Config:
 
 # Global configuration instance
 _config = None
+_config_lock = threading.Lock()
 
 def get_config() -> Config:
     """Get global configuration instance"""
     global _config
     if _config is None:
-        _config = Config()
+        with _config_lock:
+            if _config is None:
+                _config = Config()
     return _config
\ No newline at end of file
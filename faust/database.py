@@ -1,29 +1,86 @@
+import os
+import time
 import uuid
+import functools
 import json
+import asyncio
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text, Boolean, ForeignKey, Index, JSON, Enum
+from sqlalchemy import create_engine, event, inspect, select, text, Column, String, DateTime, Integer, Text, Boolean, ForeignKey, Index, JSON, Enum
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy.orm import sessionmaker, relationship, deferred, Session
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.types import TypeDecorator, VARCHAR
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
+from sqlalchemy.ext.mutable import MutableDict
 import enum
 
 from .config import get_config
 
 Base = declarative_base()
 
+# Argon2id password hashing; bcrypt is only kept to verify hashes from older accounts
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=4, hash_len=32)
+
+# Thread pool for async password hashing, created on first use
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+def _get_hash_pool() -> ThreadPoolExecutor:
+    """Get the shared password hashing thread pool"""
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='faust-hash')
+    return _hash_pool
+
+# Health checks reuse the user count for a few seconds: [user_count, expires_at]
+_HEALTH_CACHE_TTL = 5.0
+_health_cache = [0, 0.0]
+
+@functools.lru_cache(maxsize=4096)
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    """ISO 8601 string for a timestamp (memoized, rows are serialized repeatedly)"""
+    return dt.isoformat() if dt else None
+
+class utcnow(FunctionElement):
+    """Current UTC time, evaluated by the database (column server defaults)"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is UTC but whole seconds; keep sub-second precision
+    # like the timestamps the app writes
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+@compiles(utcnow, 'postgresql')
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
 class UUID(TypeDecorator):
-    """Platform-independent UUID type for SQLite"""
+    """Platform-independent UUID type: native UUID on PostgreSQL, VARCHAR(36) elsewhere"""
     impl = VARCHAR
     cache_ok = True
 
     def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(PG_UUID(as_uuid=True))
         return dialect.type_descriptor(VARCHAR(36))
 
     def process_bind_param(self, value, dialect):
         if value is None:
             return value
+        if dialect.name == 'postgresql':
+            return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
         return str(value)
 
     def process_result_value(self, value, dialect):
@@ -41,7 +98,6 @@ class AcademicLevel(enum.Enum):
 class User(Base):
     """User model for authentication and preferences"""
     __tablename__ = 'users'
-    
     # Primary key
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -56,16 +112,17 @@ class User(Base):
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    last_active = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Timestamps (the Python default covers databases created before the server defaults);
+    # last_active is set on login and session restore, not on every profile change
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow(), nullable=False)
+    last_active = Column(DateTime, default=datetime.utcnow, server_default=utcnow(), nullable=False)
     last_login = Column(DateTime, nullable=True)
 
     # Enhanced academic level support
     academic_level = Column(Enum(AcademicLevel), default=AcademicLevel.NORMAL, nullable=False)
     
-    # User preferences as JSON
-    preferences = Column(JSON, default=lambda: {
+    # User preferences as JSON (JSONB on PostgreSQL); in-place key changes are tracked
+    preferences = Column(MutableDict.as_mutable(JSON().with_variant(JSONB(), 'postgresql')), default=lambda: {
         'theme': 'dark',
         'math_display': 'unicode',
         'auto_save': True,
@@ -74,12 +131,11 @@ class User(Base):
         'preferred_explanation_style': 'balanced'  # concise, balanced, detailed
     })
     
-    # Relationships
-    chat_sessions = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (never lazy loaded; use selectinload() where they are needed)
+    chat_sessions = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan", lazy='raise')
     
     # Indexes for performance
     __table_args__ = (
-        Index('idx_username', 'username'),
         Index('idx_email', 'email'),
         Index('idx_last_active', 'last_active'),
     )
@@ -89,19 +145,48 @@ class User(Base):
     
     def set_password(self, password: str):
         """Hash and set password"""
+        self._validate_password(password)
+        self.password_hash = _password_hasher.hash(password)
+    
+    async def set_password_async(self, password: str):
+        """Hash and set password without blocking the event loop"""
+        self._validate_password(password)
+        loop = asyncio.get_running_loop()
+        self.password_hash = await loop.run_in_executor(_get_hash_pool(), _password_hasher.hash, password)
+    
+    @staticmethod
+    def _validate_password(password: str):
+        """Enforce password length limits"""
         if not password or len(password) < 6:
             raise ValueError("Password must be at least 6 characters")
         if len(password) > 128:
             raise ValueError("Password too long")
-            
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
     
     def check_password(self, password: str) -> bool:
         """Verify password against hash"""
         if not self.password_hash or not password:
             return False
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        
+        if self._has_legacy_hash():
+            return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        
+        try:
+            return _password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    async def check_password_async(self, password: str) -> bool:
+        """Verify password against hash on the hashing thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_pool(), self.check_password, password)
+    
+    def password_needs_rehash(self) -> bool:
+        """Check whether the stored hash is bcrypt or uses outdated Argon2 parameters"""
+        return self._has_legacy_hash() or _password_hasher.check_needs_rehash(self.password_hash)
+    
+    def _has_legacy_hash(self) -> bool:
+        """Check for a bcrypt hash from before the switch to Argon2"""
+        return self.password_hash.startswith('$2')
     
 
     def set_academic_level(self, level: str):
@@ -128,9 +213,9 @@ class User(Base):
             'display_name': self.display_name,
             'is_active': self.is_active,
             'academic_level': self.get_academic_level(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_active': self.last_active.isoformat() if self.last_active else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'created_at': _iso(self.created_at),
+            'last_active': _iso(self.last_active),
+            'last_login': _iso(self.last_login),
             'preferences': self.preferences or {}
         }
         
@@ -143,7 +228,6 @@ class User(Base):
 class ChatSession(Base):
     """Chat session with AI context persistence"""
     __tablename__ = 'chat_sessions'
-    
     # Primary key
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -157,12 +241,9 @@ class ChatSession(Base):
     title = Column(String(500), nullable=False, default="New Math Session")
     message_count = Column(Integer, default=0, nullable=False)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    last_active = Column(DateTime, default=datetime.utcnow, nullable=False)
-    
-    # AI Context Storage for conversation continuity
-    ai_context = Column(JSON, default=list)
+    # Timestamps (the Python default covers databases created before the server defaults)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow(), nullable=False)
+    last_active = Column(DateTime, default=datetime.utcnow, server_default=utcnow(), onupdate=datetime.utcnow, nullable=False)
     
     # Status
     is_archived = Column(Boolean, default=False, nullable=False)
@@ -170,33 +251,31 @@ class ChatSession(Base):
     #Session-specific academic level override
     session_academic_level = Column(Enum(AcademicLevel), nullable=True)  # None = use user default
     
-    # Relationships
-    user = relationship("User", back_populates="chat_sessions")
-    messages = relationship("Message", back_populates="chat_session", cascade="all, delete-orphan")
+    # Relationships (never lazy loaded; use selectinload() where they are needed)
+    user = relationship("User", back_populates="chat_sessions", lazy='raise')
+    messages = relationship(
+        "Message", back_populates="chat_session", cascade="all, delete-orphan", lazy='raise', order_by="Message.id"
+    )
     
     # Indexes for performance
     __table_args__ = (
         Index('idx_session_id', 'session_id'),
         Index('idx_user_sessions', 'user_id', 'last_active'),
+        # Only unarchived sessions are ever listed, so only they are indexed
+        Index('idx_user_active_sessions', 'user_id', last_active.desc(),
+              postgresql_where=is_archived == False, sqlite_where=is_archived == False),
         Index('idx_archived', 'is_archived'),
     )
     
     def __repr__(self):
         return f"<ChatSession(id={self.id}, session_id={self.session_id[:8]}..., user_id={self.user_id})>"
     
-    def store_ai_context(self, chat_history: List[Dict[str, Any]]):
-        """Store AI chat history for context restoration"""
-        self.ai_context = chat_history
-        self.last_active = datetime.utcnow()
-    
     def get_ai_context(self) -> List[Dict[str, Any]]:
-        """Retrieve AI chat history"""
-        return self.ai_context or []
-    
-    def clear_ai_context(self):
-        """Clear AI context when conversation is reset"""
-        self.ai_context = []
-        self.last_active = datetime.utcnow()
+        """Rebuild AI chat history from stored messages (messages must be eager loaded)"""
+        return [
+            {'role': 'user' if msg.role == 'user' else 'model', 'parts': [{'text': msg.content}]}
+            for msg in self.messages
+        ]
     
     def belongs_to_user(self, user_id: int) -> bool:
         """Security check: verify session belongs to user"""
@@ -225,8 +304,8 @@ class ChatSession(Base):
             'user_id': self.user_id,
             'title': self.title,
             'message_count': self.message_count,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_active': self.last_active.isoformat() if self.last_active else None,
+            'created_at': _iso(self.created_at),
+            'last_active': _iso(self.last_active),
             'is_archived': self.is_archived,
             'session_academic_level': self.session_academic_level.value if self.session_academic_level else None
         }
@@ -248,10 +327,11 @@ class Message(Base):
     
     # Message content
     role = Column(String(20), nullable=False)  # 'user' or 'assistant'
-    content = Column(Text, nullable=False)
+    content = deferred(Column(Text, nullable=False))  # Loaded on access or via undefer()
+    content_preview = Column(String(200), nullable=True)  # Leading text for listings
     
     # Metadata
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=utcnow(), nullable=False)
     tokens_used = Column(Integer, nullable=True)
     response_time_ms = Column(Integer, nullable=True)
     
@@ -265,20 +345,42 @@ class Message(Base):
     )
     
     def __repr__(self):
-        content_preview = self.content[:50] + "..." if len(self.content) > 50 else self.content
+        preview = self.get_preview()
+        content_preview = preview[:50] + "..." if len(preview) > 50 else preview
         return f"<Message(id={self.id}, role={self.role}, content='{content_preview}')>"
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
+    def get_preview(self) -> str:
+        """Leading text of the message (rows saved before previews existed load the content)"""
+        if self.content_preview is not None:
+            return self.content_preview
+        return self.content[:200]
+    
+    def to_dict(self, include_content: bool = True) -> Dict[str, Any]:
+        """Convert to dictionary; the preview is always included, the full content only with include_content"""
+        data = {
             'id': self.id,
             'chat_session_id': self.chat_session_id,
             'role': self.role,
-            'content': self.content,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'content_preview': self.get_preview(),
+            'timestamp': _iso(self.timestamp),
             'tokens_used': self.tokens_used,
             'response_time_ms': self.response_time_ms
         }
+        
+        if include_content:
+            data['content'] = self.content
+        
+        return data
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection: WAL journal, relaxed fsync, in-memory temp tables, larger caches"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.execute("PRAGMA cache_size=-64000")  # ~64 MB
+    cursor.close()
 
 class Database:
     """Database manager for Faust application"""
@@ -287,18 +389,62 @@ class Database:
         config = get_config()
         self.database_url = config.get_database_url()
         
-        self.engine = create_engine(
-            self.database_url,
-            echo=False,  # Set to True for SQL debugging
-            pool_pre_ping=True,
-            pool_recycle=300
-        )
+        if self.database_url.startswith('sqlite'):
+            # Local file connections don't go stale; recycling them would also
+            # re-run the pragmas and drop SQLite's page cache
+            self.engine = create_engine(
+                self.database_url,
+                echo=False  # Set to True for SQL debugging
+            )
+            event.listen(self.engine, "connect", _set_sqlite_pragmas)
+        else:
+            self.engine = create_engine(
+                self.database_url,
+                echo=False,
+                pool_size=5,  # One interactive user plus the background message writer
+                max_overflow=2,
+                pool_pre_ping=True,
+                pool_recycle=1800
+            )
         
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
     
     def create_tables(self):
         """Create all database tables"""
         Base.metadata.create_all(bind=self.engine)
+        
+        # create_all() skips tables that already exist, so add indexes introduced since
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+        
+        # Databases created before message previews existed
+        message_columns = {column['name'] for column in inspect(self.engine).get_columns('messages')}
+        if 'content_preview' not in message_columns:
+            with self.engine.begin() as connection:
+                connection.execute(text("ALTER TABLE messages ADD COLUMN content_preview VARCHAR(200)"))
+                connection.execute(text(
+                    "UPDATE messages SET content_preview = substr(content, 1, 200) WHERE content_preview IS NULL"
+                ))
+        
+        if self.engine.dialect.name == 'postgresql':
+            inspector = inspect(self.engine)
+            
+            # PostgreSQL databases created while session ids were still VARCHAR(36)
+            session_columns = {column['name']: column['type'] for column in inspector.get_columns('chat_sessions')}
+            if isinstance(session_columns['session_id'], String):
+                with self.engine.begin() as connection:
+                    connection.execute(text(
+                        "ALTER TABLE chat_sessions ALTER COLUMN session_id TYPE uuid USING session_id::uuid"
+                    ))
+            
+            # ...and while preferences were still json (update_preference relies on jsonb)
+            user_columns = {column['name']: column['type'] for column in inspector.get_columns('users')}
+            if not isinstance(user_columns['preferences'], JSONB):
+                with self.engine.begin() as connection:
+                    connection.execute(text(
+                        "ALTER TABLE users ALTER COLUMN preferences TYPE jsonb USING preferences::jsonb"
+                    ))
     
     def get_session(self) -> Session:
         """Get a database session"""
@@ -312,10 +458,16 @@ class Database:
         """Check database connectivity"""
         try:
             with self.get_session() as session:
-                user_count = session.query(User).count()
+                session.execute(text("SELECT 1")).scalar()
+                
+                now = time.monotonic()
+                if now >= _health_cache[1]:
+                    _health_cache[0] = session.query(User.id).count()
+                    _health_cache[1] = now + _HEALTH_CACHE_TTL
+                
                 return {
                     'status': 'healthy',
-                    'user_count': user_count,
+                    'user_count': _health_cache[0],
                     'timestamp': datetime.utcnow().isoformat()
                 }
         except Exception as e:
@@ -339,19 +491,19 @@ def get_database() -> Database:
 # Helper functions for user operations
 def get_user_by_username(session: Session, username: str) -> Optional[User]:
     """Get user by username"""
-    return session.query(User).filter(
+    return session.scalar(select(User).where(
         User.username == username,
-        User.is_active == True
-    ).first()
+        User.is_active.is_(True)
+    ).limit(1))
 
 def get_user_by_email(session: Session, email: str) -> Optional[User]:
     """Get user by email address"""
     if not email:
         return None
-    return session.query(User).filter(
+    return session.scalar(select(User).where(
         User.email == email.lower(),
-        User.is_active == True
-    ).first()
+        User.is_active.is_(True)
+    ).limit(1))
 
 def create_user(session: Session, username: str, password: str, email: str = None, 
                 display_name: str = None, academic_level: str = 'normal') -> User:
@@ -389,14 +541,71 @@ def create_user(session: Session, username: str, password: str, email: str = Non
     
     return user
 
-def ensure_user_owns_session(session: Session, session_id: str, user_id: int) -> ChatSession:
-    """Security: Ensure user owns the session they're trying to access"""
-    chat_session = session.query(ChatSession).filter(
+@contextmanager
+def no_expire_on_commit(session: Session):
+    """Keep loaded attributes usable after commit instead of re-selecting them"""
+    previous = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield session
+    finally:
+        session.expire_on_commit = previous
+
+def ensure_user_owns_session(session: Session, session_id: str, user_id: int, *options) -> ChatSession:
+    """Security: Ensure user owns the session they're trying to access (options are passed to the query)"""
+    chat_session = session.scalar(select(ChatSession).options(*options).where(
         ChatSession.session_id == session_id,
         ChatSession.user_id == user_id
-    ).first()
+    ))
     
     if not chat_session:
         raise ValueError(f"Session not found or access denied")
     
-    return chat_session
\ No newline at end of file
+    return chat_session
+
+def update_preference(session: Session, user_id: int, key: str, value: Any):
+    """Set one preference key in place in the database; the caller commits"""
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statement = text(
+            "UPDATE users SET preferences = jsonb_set(COALESCE(preferences, '{}'::jsonb), :path, CAST(:value AS jsonb)) "
+            "WHERE id = :user_id"
+        )
+        path = '{' + json.dumps(key) + '}'
+    elif dialect == 'sqlite' and '"' not in key:  # SQLite JSON paths cannot escape quotes
+        statement = text(
+            "UPDATE users SET preferences = json_set(COALESCE(preferences, '{}'), :path, json(:value)) "
+            "WHERE id = :user_id"
+        )
+        path = '$.' + json.dumps(key)
+    else:
+        user = session.get(User, user_id)
+        if user:
+            if user.preferences is None:
+                user.preferences = {}
+            user.preferences[key] = value
+        return
+    
+    session.execute(statement, {'path': path, 'value': json.dumps(value), 'user_id': user_id})
+    
+    # A loaded user would still hold the old preferences
+    user = session.identity_map.get(session.identity_key(User, user_id))
+    if user is not None:
+        session.expire(user, ['preferences'])
+
+def bulk_add_messages(session: Session, chat_session_id: int, rows: List[Dict[str, Any]],
+                      batch_size: int = 1000):
+    """Insert many messages with executemany batches; the caller commits"""
+    for start in range(0, len(rows), batch_size):
+        session.execute(Message.__table__.insert(), [
+            {
+                'chat_session_id': chat_session_id,
+                'role': row['role'],
+                'content': row['content'],
+                'content_preview': row['content'][:200],
+                'timestamp': row.get('timestamp') or datetime.utcnow(),
+                'tokens_used': row.get('tokens_used'),
+                'response_time_ms': row.get('response_time_ms')
+            }
+            for row in rows[start:start + batch_size]
+        ])
@@ -1,90 +1,262 @@
 
 import re
+import bisect
+import functools
 from typing import Dict, Tuple, List
 
+try:
+    import ahocorasick
+except ImportError:  # Optional: falls back to the alternation regex
+    ahocorasick = None
+
+# Unicode character mappings
+_GREEK_LETTERS = {
+    'alpha': 'α', 'beta': 'β', 'gamma': 'γ', 'delta': 'δ', 'epsilon': 'ε',
+    'zeta': 'ζ', 'eta': 'η', 'theta': 'θ', 'iota': 'ι', 'kappa': 'κ',
+    'lambda': 'λ', 'mu': 'μ', 'nu': 'ν', 'xi': 'ξ', 'pi': 'π',
+    'rho': 'ρ', 'sigma': 'σ', 'tau': 'τ', 'upsilon': 'υ', 'phi': 'φ',
+    'chi': 'χ', 'psi': 'ψ', 'omega': 'ω',
+    'Alpha': 'Α', 'Beta': 'Β', 'Gamma': 'Γ', 'Delta': 'Δ', 'Epsilon': 'Ε',
+    'Zeta': 'Ζ', 'Eta': 'Η', 'Theta': 'Θ', 'Iota': 'Ι', 'Kappa': 'Κ',
+    'Lambda': 'Λ', 'Mu': 'Μ', 'Nu': 'Ν', 'Xi': 'Ξ', 'Pi': 'Π',
+    'Rho': 'Ρ', 'Sigma': 'Σ', 'Tau': 'Τ', 'Upsilon': 'Υ', 'Phi': 'Φ',
+    'Chi': 'Χ', 'Psi': 'Ψ', 'Omega': 'Ω'
+}
+
+_OPERATORS = {
+    'pm': '±', 'mp': '∓', 'times': '×', 'div': '÷', 'cdot': '·',
+    'neq': '≠', 'leq': '≤', 'geq': '≥', 'll': '≪', 'gg': '≫',
+    'approx': '≈', 'equiv': '≡', 'propto': '∝', 'sim': '∼',
+    'simeq': '≃', 'cong': '≅', 'not': '¬', 'neg': '¬',
+    'partial': '∂', 'nabla': '∇', 'infty': '∞',
+    'int': '∫', 'iint': '∬', 'iiint': '∭', 'oint': '∮',
+    'sum': '∑', 'prod': '∏', 'coprod': '∐',
+    'sqrt': '√', 'cbrt': '∛', 'fourthroot': '∜',
+    'angle': '∠', 'measuredangle': '∡', 'sphericalangle': '∢',
+    'perp': '⊥', 'parallel': '∥', 'nparallel': '∦',
+    'in': '∈', 'notin': '∉', 'ni': '∋', 'notni': '∌',
+    'subset': '⊂', 'supset': '⊃', 'subseteq': '⊆', 'supseteq': '⊇',
+    'subsetneq': '⊊', 'supsetneq': '⊋', 'cup': '∪', 'cap': '∩',
+    'setminus': '∖', 'emptyset': '∅', 'varnothing': '∅',
+    'forall': '∀', 'exists': '∃', 'nexists': '∄',
+    'therefore': '∴', 'because': '∵',
+    'wedge': '∧', 'vee': '∨', 'oplus': '⊕', 'ominus': '⊖',
+    'otimes': '⊗', 'oslash': '⊘', 'odot': '⊙',
+    'to': '→', 'rightarrow': '→', 'leftarrow': '←',
+    'leftrightarrow': '↔', 'uparrow': '↑', 'downarrow': '↓',
+    'Rightarrow': '⇒', 'Leftarrow': '⇐', 'Leftrightarrow': '⇔',
+    'mapsto': '↦', 'longmapsto': '⟼',
+    'deg': '°', 'prime': '′', 'dprime': '″', 'tprime': '‴'
+}
+
+_SETS = {
+    'mathbb{N}': 'ℕ', 'mathbb{Z}': 'ℤ', 'mathbb{Q}': 'ℚ',
+    'mathbb{R}': 'ℝ', 'mathbb{C}': 'ℂ', 'mathbb{H}': 'ℍ',
+    'mathbb{P}': 'ℙ', 'mathbb{E}': 'ℝ'
+}
+
+# Superscript and subscript mappings
+_SUPERSCRIPTS = {
+    '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴', '5': '⁵',
+    '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹', '+': '⁺', '-': '⁻',
+    '=': '⁼', '(': '⁽', ')': '⁾', 'n': 'ⁿ', 'i': 'ⁱ', 'x': 'ˣ'
+}
+
+_SUBSCRIPTS = {
+    '0': '₀', '1': '₁', '2': '₂', '3': '₃', '4': '₄', '5': '₅',
+    '6': '₆', '7': '₇', '8': '₈', '9': '₉', '+': '₊', '-': '₋',
+    '=': '₌', '(': '₍', ')': '₎', 'a': 'ₐ', 'e': 'ₑ', 'h': 'ₕ',
+    'i': 'ᵢ', 'j': 'ⱼ', 'k': 'ₖ', 'l': 'ₗ', 'm': 'ₘ', 'n': 'ₙ',
+    'o': 'ₒ', 'p': 'ₚ', 'r': 'ᵣ', 's': 'ₛ', 't': 'ₜ', 'u': 'ᵤ',
+    'v': 'ᵥ', 'x': 'ₓ'
+}
+
+_FRACTIONS = {
+    ('1', '2'): '½', ('1', '3'): '⅓', ('2', '3'): '⅔',
+    ('1', '4'): '¼', ('3', '4'): '¾', ('1', '5'): '⅕',
+    ('2', '5'): '⅖', ('3', '5'): '⅗', ('4', '5'): '⅘',
+    ('1', '6'): '⅙', ('5', '6'): '⅚', ('1', '7'): '⅐',
+    ('1', '8'): '⅛', ('3', '8'): '⅜', ('5', '8'): '⅝',
+    ('7', '8'): '⅞', ('1', '9'): '⅑', ('1', '10'): '⅒'
+}
+
+_ROOT_SYMBOLS = {'3': '∛', '4': '∜'}
+
+# Translation tables for script conversion
+_SUPER_TABLE = str.maketrans(_SUPERSCRIPTS)
+_SUB_TABLE = str.maketrans(_SUBSCRIPTS)
+
+# Greek letters, operators and number sets are replaced in one pass; longer names are
+# tried first and a name must not run into further letters (\in vs \int vs \infty)
+_SYMBOL_MAP = {**_GREEK_LETTERS, **_OPERATORS, **_SETS}
+_SYMBOL_RE = re.compile(
+    r'\\(' + '|'.join(re.escape(name) for name in sorted(_SYMBOL_MAP, key=len, reverse=True)) + r')(?![A-Za-z])'
+)
+
+def _build_symbol_automaton():
+    """Same lookup as a single-pass Aho-Corasick automaton when pyahocorasick is installed"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for name, symbol in _SYMBOL_MAP.items():
+        automaton.add_word('\\' + name, (len(name) + 1, symbol))
+    automaton.make_automaton()
+    return automaton
+
+_SYMBOL_AUTOMATON = _build_symbol_automaton()
+
+# Precompiled patterns
+_INLINE_RE = re.compile(r'\$([^$]+)\$')
+_DISPLAY_RE = re.compile(r'\$\$([^$]+)\$\$')
+_EQUATION_RE = re.compile(r'\\begin\{equation\}(.*?)\\end\{equation\}', re.DOTALL)
+_ENV_TOKEN_RE = re.compile(r'\\(begin|end)\{equation\}')
+_FRAC_RE = re.compile(r'\\frac\{([^}]+)\}\{([^}]+)\}')
+_SUPER_RE = re.compile(r'\^\{([^}]+)\}|\^(.)')
+_SUB_RE = re.compile(r'_\{([^}]+)\}|_(.)')
+_SQRT_RE = re.compile(r'\\sqrt\{([^}]+)\}')
+_NROOT_RE = re.compile(r'\\sqrt\[([^]]+)\]\{([^}]+)\}')
+_LIM_RE = re.compile(r'\\lim_\{([^}]+)\}')
+_LIMIT_LIKE = [
+    (re.compile(r'\\max_\{([^}]+)\}'), r'max[\1]'),
+    (re.compile(r'\\min_\{([^}]+)\}'), r'min[\1]'),
+    (re.compile(r'\\sup_\{([^}]+)\}'), r'sup[\1]'),
+    (re.compile(r'\\inf_\{([^}]+)\}'), r'inf[\1]'),
+]
+
+# Leftover LaTeX: \left/\right delimiters, text-style wrappers, then spacing and
+# any other command (which just loses its backslash)
+_DELIMITER_RE = re.compile(r'\\left([(\[{|])|\\right([)\]}|])')
+_WRAPPER_RE = re.compile(r'\\(?:text|mathrm|mathit|mathbf)\{([^}]+)\}')
+_COMMAND_RE = re.compile(r'\\(qquad|quad|;|,|[a-zA-Z]+)')
+_LATEX_SPACES = {'qquad': '        ', 'quad': '    ', ';': '  ', ',': ' '}
+
 class MathRenderer:
     """Convert LaTeX math expressions to Unicode for terminal display"""
     
+    # Shared, read-only mappings
+    greek_letters = _GREEK_LETTERS
+    operators = _OPERATORS
+    sets = _SETS
+    superscripts = _SUPERSCRIPTS
+    subscripts = _SUBSCRIPTS
+    
     def __init__(self):
-        # Unicode character mappings
-        self.greek_letters = {
-            'alpha': 'α', 'beta': 'β', 'gamma': 'γ', 'delta': 'δ', 'epsilon': 'ε',
-            'zeta': 'ζ', 'eta': 'η', 'theta': 'θ', 'iota': 'ι', 'kappa': 'κ',
-            'lambda': 'λ', 'mu': 'μ', 'nu': 'ν', 'xi': 'ξ', 'pi': 'π',
-            'rho': 'ρ', 'sigma': 'σ', 'tau': 'τ', 'upsilon': 'υ', 'phi': 'φ',
-            'chi': 'χ', 'psi': 'ψ', 'omega': 'ω',
-            'Alpha': 'Α', 'Beta': 'Β', 'Gamma': 'Γ', 'Delta': 'Δ', 'Epsilon': 'Ε',
-            'Zeta': 'Ζ', 'Eta': 'Η', 'Theta': 'Θ', 'Iota': 'Ι', 'Kappa': 'Κ',
-            'Lambda': 'Λ', 'Mu': 'Μ', 'Nu': 'Ν', 'Xi': 'Ξ', 'Pi': 'Π',
-            'Rho': 'Ρ', 'Sigma': 'Σ', 'Tau': 'Τ', 'Upsilon': 'Υ', 'Phi': 'Φ',
-            'Chi': 'Χ', 'Psi': 'Ψ', 'Omega': 'Ω'
-        }
-        
-        self.operators = {
-            'pm': '±', 'mp': '∓', 'times': '×', 'div': '÷', 'cdot': '·',
-            'neq': '≠', 'leq': '≤', 'geq': '≥', 'll': '≪', 'gg': '≫',
-            'approx': '≈', 'equiv': '≡', 'propto': '∝', 'sim': '∼',
-            'simeq': '≃', 'cong': '≅', 'not': '¬', 'neg': '¬',
-            'partial': '∂', 'nabla': '∇', 'infty': '∞',
-            'int': '∫', 'iint': '∬', 'iiint': '∭', 'oint': '∮',
-            'sum': '∑', 'prod': '∏', 'coprod': '∐',
-            'sqrt': '√', 'cbrt': '∛', 'fourthroot': '∜',
-            'angle': '∠', 'measuredangle': '∡', 'sphericalangle': '∢',
-            'perp': '⊥', 'parallel': '∥', 'nparallel': '∦',
-            'in': '∈', 'notin': '∉', 'ni': '∋', 'notni': '∌',
-            'subset': '⊂', 'supset': '⊃', 'subseteq': '⊆', 'supseteq': '⊇',
-            'subsetneq': '⊊', 'supsetneq': '⊋', 'cup': '∪', 'cap': '∩',
-            'setminus': '∖', 'emptyset': '∅', 'varnothing': '∅',
-            'forall': '∀', 'exists': '∃', 'nexists': '∄',
-            'therefore': '∴', 'because': '∵',
-            'wedge': '∧', 'vee': '∨', 'oplus': '⊕', 'ominus': '⊖',
-            'otimes': '⊗', 'oslash': '⊘', 'odot': '⊙',
-            'to': '→', 'rightarrow': '→', 'leftarrow': '←',
-            'leftrightarrow': '↔', 'uparrow': '↑', 'downarrow': '↓',
-            'Rightarrow': '⇒', 'Leftarrow': '⇐', 'Leftrightarrow': '⇔',
-            'mapsto': '↦', 'longmapsto': '⟼',
-            'deg': '°', 'prime': '′', 'dprime': '″', 'tprime': '‴'
-        }
-        
-        self.sets = {
-            'mathbb{N}': 'ℕ', 'mathbb{Z}': 'ℤ', 'mathbb{Q}': 'ℚ',
-            'mathbb{R}': 'ℝ', 'mathbb{C}': 'ℂ', 'mathbb{H}': 'ℍ',
-            'mathbb{P}': 'ℙ', 'mathbb{E}': 'ℝ'
-        }
-        
-        # Superscript and subscript mappings
-        self.superscripts = {
-            '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴', '5': '⁵',
-            '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹', '+': '⁺', '-': '⁻',
-            '=': '⁼', '(': '⁽', ')': '⁾', 'n': 'ⁿ', 'i': 'ⁱ', 'x': 'ˣ'
-        }
-        
-        self.subscripts = {
-            '0': '₀', '1': '₁', '2': '₂', '3': '₃', '4': '₄', '5': '₅',
-            '6': '₆', '7': '₇', '8': '₈', '9': '₉', '+': '₊', '-': '₋',
-            '=': '₌', '(': '₍', ')': '₎', 'a': 'ₐ', 'e': 'ₑ', 'h': 'ₕ',
-            'i': 'ᵢ', 'j': 'ⱼ', 'k': 'ₖ', 'l': 'ₗ', 'm': 'ₘ', 'n': 'ₙ',
-            'o': 'ₒ', 'p': 'ₚ', 'r': 'ᵣ', 's': 'ₛ', 't': 'ₜ', 'u': 'ᵤ',
-            'v': 'ᵥ', 'x': 'ₓ'
-        }
+        # Memoize whole-text renders (greetings and redrawn responses repeat)
+        self.render = functools.lru_cache(maxsize=64)(self.render)
+        
+        # Memoize single expressions (the same equations recur across turns)
+        self._convert_math = functools.lru_cache(maxsize=1024)(self._convert_math)
     
     def render(self, text: str) -> str:
         """Convert LaTeX math expressions to Unicode"""
         if not text:
             return text
         
+        # Plain prose: nothing for the patterns below to match
+        if '$' not in text and '\\begin' not in text:
+            return text
+        
         # Handle inline math: $...$
-        text = re.sub(r'\$([^$]+)\$', lambda m: self._convert_math(m.group(1)), text)
+        text = _INLINE_RE.sub(lambda m: self._convert_math(m.group(1)), text)
         
         # Handle display math: $$...$$
-        text = re.sub(r'\$\$([^$]+)\$\$', lambda m: '\n' + self._convert_math(m.group(1)) + '\n', text)
+        text = _DISPLAY_RE.sub(lambda m: '\n' + self._convert_math(m.group(1)) + '\n', text)
         
         # Handle LaTeX math environments
-        text = re.sub(r'\\begin\{equation\}(.*?)\\end\{equation\}', 
-                     lambda m: '\n' + self._convert_math(m.group(1)) + '\n', text, flags=re.DOTALL)
+        text = _EQUATION_RE.sub(lambda m: '\n' + self._convert_math(m.group(1)) + '\n', text)
         
         return text
     
+    def render_incremental(self, rendered: str, new_text: str, carry: str = "") -> Tuple[str, str]:
+        """Render newly streamed text on top of an already rendered prefix
+        
+        Returns the extended rendered text and the carry-over that cannot be
+        rendered yet (an unterminated $...$ or \\begin{equation} block).
+        """
+        text = carry + new_text
+        boundary = self._safe_boundary(text)
+        return rendered + self.render(text[:boundary]), text[boundary:]
+    
+    def _safe_boundary(self, text: str) -> int:
+        """Find where the still-open math expression (if any) begins"""
+        # Walk the $ delimiters the same way the inline pattern pairs them
+        spans = []
+        skipped = []
+        boundary = len(text)
+        i = text.find('$')
+        while i != -1:
+            if i + 1 == len(text):
+                boundary = i
+                break
+            if text[i + 1] == '$':
+                skipped.append(i)
+                i += 1
+                continue
+            close = text.find('$', i + 1)
+            if close == -1:
+                boundary = i
+                break
+            spans.append((i, close + 1))
+            i = text.find('$', close + 1)
+        
+        # Leftover dollars could still pair up as $$...$$ with text yet to come
+        if skipped:
+            inline = _INLINE_RE.sub(lambda m: self._convert_math(m.group(1)), text[:boundary])
+            if '$$' in inline or inline.endswith('$'):
+                boundary = skipped[0]
+                spans = [span for span in spans if span[1] <= boundary]
+        
+        # Equation environments are paired after inline math has been converted, so
+        # look for them in that output (converted math can produce \begin{equation}
+        # from a stray backslash); pieces maps output offsets back to the source
+        output = []
+        pieces = []  # (output offset, source offset, converted inline math?)
+        size = 0
+        gap_start = 0
+        for span_start, span_end in spans + [(boundary, boundary)]:
+            segments = [(gap_start, text[gap_start:span_start], False)]
+            if span_end > span_start:
+                segments.append((span_start, self._convert_math(text[span_start + 1:span_end - 1]), True))
+            for source, piece, is_math in segments:
+                if piece:
+                    pieces.append((size, source, is_math))
+                    output.append(piece)
+                    size += len(piece)
+            gap_start = span_end
+        output = ''.join(output)
+        
+        # Pair the environments the way _EQUATION_RE will; an unpaired begin stays open
+        matched = []
+        open_env = None
+        for match in _ENV_TOKEN_RE.finditer(output):
+            matched.append(match.span())
+            if open_env is None and match.group(1) == 'begin':
+                open_env = match.start()
+            elif open_env is not None and match.group(1) == 'end':
+                matched.append((open_env, match.end()))
+                open_env = None
+        
+        # Otherwise, a partial \begin{equation} at the end could still be completed
+        cut = open_env
+        if cut is None:
+            backslash = output.rfind('\\', max(0, len(output) - len('\\begin{equation}') + 1))
+            if backslash != -1 and '\\begin{equation}'.startswith(output[backslash:]):
+                cut = backslash
+        if cut is None:
+            return boundary
+        
+        # Move the cut back until it splits neither converted math nor a token or
+        # environment pair (tokens can form across neighbouring pieces)
+        while True:
+            out_start, source, is_math = pieces[bisect.bisect_right(pieces, (cut, len(text) + 1)) - 1]
+            earlier = out_start if is_math and cut > out_start else cut
+            for pair_start, pair_end in matched:
+                if pair_start < earlier < pair_end:
+                    earlier = pair_start
+            if earlier == cut:
+                return source if is_math else source + cut - out_start
+            cut = earlier
+    
     def _convert_math(self, math_expr: str) -> str:
         """Convert a single math expression"""
         # Remove extra whitespace
@@ -96,14 +268,8 @@ class MathRenderer:
         # Convert superscripts and subscripts
         expr = self._convert_scripts(expr)
         
-        # Convert Greek letters
-        expr = self._convert_greek(expr)
-        
-        # Convert operators
-        expr = self._convert_operators(expr)
-        
-        # Convert number sets
-        expr = self._convert_sets(expr)
+        # Convert Greek letters, operators and number sets
+        expr = self._convert_symbols(expr)
         
         # Convert roots
         expr = self._convert_roots(expr)
@@ -122,78 +288,65 @@ class MathRenderer:
             num = match.group(1)
             den = match.group(2)
             
-            # Simple fraction mappings
-            fraction_map = {
-                ('1', '2'): '½', ('1', '3'): '⅓', ('2', '3'): '⅔',
-                ('1', '4'): '¼', ('3', '4'): '¾', ('1', '5'): '⅕',
-                ('2', '5'): '⅖', ('3', '5'): '⅗', ('4', '5'): '⅘',
-                ('1', '6'): '⅙', ('5', '6'): '⅚', ('1', '7'): '⅐',
-                ('1', '8'): '⅛', ('3', '8'): '⅜', ('5', '8'): '⅝',
-                ('7', '8'): '⅞', ('1', '9'): '⅑', ('1', '10'): '⅒'
-            }
-            
-            if (num, den) in fraction_map:
-                return fraction_map[(num, den)]
+            if (num, den) in _FRACTIONS:
+                return _FRACTIONS[(num, den)]
             else:
                 return f"({num})/({den})"
         
-        return re.sub(r'\\frac\{([^}]+)\}\{([^}]+)\}', replace_frac, expr)
+        return _FRAC_RE.sub(replace_frac, expr)
     
     def _convert_scripts(self, expr: str) -> str:
         """Convert superscripts and subscripts"""
         # Superscripts: ^{...} or ^single_char
         def replace_super(match):
             content = match.group(1) or match.group(2)
-            return ''.join(self.superscripts.get(c, c) for c in content)
+            return content.translate(_SUPER_TABLE)
         
-        expr = re.sub(r'\^\{([^}]+)\}|\^(.)', replace_super, expr)
+        expr = _SUPER_RE.sub(replace_super, expr)
         
         # Subscripts: _{...} or _single_char
         def replace_sub(match):
             content = match.group(1) or match.group(2)
-            return ''.join(self.subscripts.get(c, c) for c in content)
-        
-        expr = re.sub(r'_\{([^}]+)\}|_(.)', replace_sub, expr)
-        
-        return expr
-    
-    def _convert_greek(self, expr: str) -> str:
-        """Convert Greek letters"""
-        for latex, unicode_char in self.greek_letters.items():
-            expr = expr.replace(f'\\{latex}', unicode_char)
+            return content.translate(_SUB_TABLE)
         
-        return expr
-    
-    def _convert_operators(self, expr: str) -> str:
-        """Convert mathematical operators"""
-        for latex, unicode_char in self.operators.items():
-            expr = expr.replace(f'\\{latex}', unicode_char)
+        expr = _SUB_RE.sub(replace_sub, expr)
         
         return expr
     
-    def _convert_sets(self, expr: str) -> str:
-        """Convert number sets"""
-        for latex, unicode_char in self.sets.items():
-            expr = expr.replace(f'\\{latex}', unicode_char)
-        
-        return expr
+    def _convert_symbols(self, expr: str) -> str:
+        """Convert Greek letters, operators and number sets"""
+        if _SYMBOL_AUTOMATON is None or '\\' not in expr:
+            return _SYMBOL_RE.sub(lambda m: _SYMBOL_MAP[m.group(1)], expr)
+        
+        # Longest match per position; a name running into further letters is left alone,
+        # as no shorter name at the same position can end before a non-letter either
+        parts = []
+        pos = 0
+        for end, (length, symbol) in _SYMBOL_AUTOMATON.iter_long(expr):
+            after = end + 1
+            if after < len(expr) and expr[after].isascii() and expr[after].isalpha():
+                continue
+            parts.append(expr[pos:after - length])
+            parts.append(symbol)
+            pos = after
+        parts.append(expr[pos:])
+        return ''.join(parts)
     
     def _convert_roots(self, expr: str) -> str:
         """Convert roots"""
         # Square root: \\sqrt{...}
-        expr = re.sub(r'\\sqrt\{([^}]+)\}', r'√(\1)', expr)
+        expr = _SQRT_RE.sub(r'√(\1)', expr)
         
         # Nth root: \\sqrt[n]{...}
         def replace_nroot(match):
             n = match.group(1)
             content = match.group(2)
-            root_symbols = {'3': '∛', '4': '∜'}
-            if n in root_symbols:
-                return f"{root_symbols[n]}({content})"
+            if n in _ROOT_SYMBOLS:
+                return f"{_ROOT_SYMBOLS[n]}({content})"
             else:
                 return f"ⁿ√({content})"  # Fallback for other roots
         
-        expr = re.sub(r'\\sqrt\[([^]]+)\]\{([^}]+)\}', replace_nroot, expr)
+        expr = _NROOT_RE.sub(replace_nroot, expr)
         
         return expr
     
@@ -205,45 +358,24 @@ class MathRenderer:
             var_to_val = var_to_val.replace('\\to', '→')
             return f"lim[{var_to_val}]"
         
-        expr = re.sub(r'\\lim_\{([^}]+)\}', replace_limit, expr)
+        expr = _LIM_RE.sub(replace_limit, expr)
         
         # Handle other limit-like expressions
-        expr = re.sub(r'\\max_\{([^}]+)\}', r'max[\1]', expr)
-        expr = re.sub(r'\\min_\{([^}]+)\}', r'min[\1]', expr)
-        expr = re.sub(r'\\sup_\{([^}]+)\}', r'sup[\1]', expr)
-        expr = re.sub(r'\\inf_\{([^}]+)\}', r'inf[\1]', expr)
+        for pattern, replacement in _LIMIT_LIKE:
+            expr = pattern.sub(replacement, expr)
         
         return expr
     
     def _cleanup_latex(self, expr: str) -> str:
         """Clean up remaining LaTeX commands"""
-        # Remove common LaTeX commands that don't have Unicode equivalents
-        cleanup_patterns = [
-            (r'\\left\(', '('),
-            (r'\\right\)', ')'),
-            (r'\\left\[', '['),
-            (r'\\right\]', ']'),
-            (r'\\left\{', '{'),
-            (r'\\right\}', '}'),
-            (r'\\left\|', '|'),
-            (r'\\right\|', '|'),
-            (r'\\text\{([^}]+)\}', r'\1'),
-            (r'\\mathrm\{([^}]+)\}', r'\1'),
-            (r'\\mathit\{([^}]+)\}', r'\1'),
-            (r'\\mathbf\{([^}]+)\}', r'\1'),
-            (r'\\,', ' '),  # Small space
-            (r'\\;', '  '), # Medium space
-            (r'\\quad', '    '), # Quad space
-            (r'\\qquad', '        '), # Double quad space
-        ]
-        
-        for pattern, replacement in cleanup_patterns:
-            expr = re.sub(pattern, replacement, expr)
-        
-        # Remove any remaining backslashes that might be LaTeX artifacts
-        expr = re.sub(r'\\([a-zA-Z]+)', r'\1', expr)
+        expr = _DELIMITER_RE.sub(r'\1\2', expr)
         
-        return expr
+        # Repeat so nested wrappers like \\mathbf{\\text{x}} come apart too
+        count = 1
+        while count:
+            expr, count = _WRAPPER_RE.subn(r'\1', expr)
+        
+        return _COMMAND_RE.sub(lambda m: _LATEX_SPACES.get(m.group(1), m.group(1)), expr)
     
     def format_equation(self, equation: str, title: str = None) -> str:
         """Format an equation with optional title for display"""
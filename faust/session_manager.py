@@ -1,26 +1,154 @@
 import uuid
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import time
+import queue
+import threading
+import calendar
+import functools
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import delete, func
 from sqlalchemy.exc import SQLAlchemyError
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
+from sqlalchemy.orm import selectinload, undefer
 
 from .database import (
     get_database, User, ChatSession, Message, 
-    ensure_user_owns_session
+    ensure_user_owns_session, bulk_add_messages, no_expire_on_commit
 )
 from .ai_service import get_ai_service
 
+# How long a user's default academic level is trusted before it is read again
+_USER_LEVEL_TTL = 300.0
+
+# Loading a session only bumps its last_active when it is at least this many seconds old
+_LAST_ACTIVE_DEBOUNCE = 60.0
+
+# Background message writes: exchanges per transaction, and how long to wait for more
+_WRITE_BATCH_SIZE = 10
+_WRITE_INTERVAL = 0.25  # seconds
+_FLUSH_TIMEOUT = 10.0  # seconds a command (or exit) waits for queued writes
+
+# "Last active" ages: (seconds that must be exceeded, seconds per unit, suffix)
+_AGE_UNITS = ((86399, 86400, 'd'), (3600, 3600, 'h'), (60, 60, 'm'))
+
+class MessageWriter:
+    """Background thread that saves queued exchanges in batched transactions
+    
+    write(exchanges, session_id) runs on the thread and returns the saved session's
+    state. Those states and any errors are collected here and applied by the main
+    thread through take_results().
+    """
+    
+    def __init__(self, write: Callable[[List[Tuple[str, str, Optional[int], Optional[int]]], str], Dict[str, Any]]):
+        self._write = write
+        self._queue = queue.Queue()
+        self._unfinished = 0  # Queued exchanges not yet written (or failed)
+        self._all_done = threading.Condition()
+        self._results_lock = threading.Lock()
+        self._saved: Dict[str, Dict[str, Any]] = {}
+        self._errors: List[str] = []
+        self._thread = threading.Thread(target=self._run, name='faust-message-writer', daemon=True)
+        self._thread.start()
+    
+    def enqueue(self, session_id: str, exchange: Tuple[str, str, Optional[int], Optional[int]]):
+        """Queue an exchange for saving without waiting for the database"""
+        with self._all_done:
+            self._unfinished += 1
+        self._queue.put((session_id, exchange))
+    
+    def flush(self, timeout: float = _FLUSH_TIMEOUT) -> bool:
+        """Wait until everything queued so far has been written (or has failed); False on timeout"""
+        with self._all_done:
+            return self._all_done.wait_for(lambda: self._unfinished == 0, timeout)
+    
+    def take_results(self) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Hand over the latest saved state per session and the errors since the last call"""
+        with self._results_lock:
+            saved, self._saved = self._saved, {}
+            errors, self._errors = self._errors, []
+        return saved, errors
+    
+    def _run(self):
+        """Collect exchanges for a short interval, then write them per session"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + _WRITE_INTERVAL
+            while len(batch) < _WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            # Consecutive exchanges of the same session share a transaction
+            start = 0
+            while start < len(batch):
+                session_id = batch[start][0]
+                end = start
+                while end < len(batch) and batch[end][0] == session_id:
+                    end += 1
+                try:
+                    saved = self._write([item[1] for item in batch[start:end]], session_id)
+                except Exception as e:
+                    with self._results_lock:
+                        self._errors.append(str(e))
+                else:
+                    with self._results_lock:
+                        self._saved[session_id] = saved
+                finally:
+                    # Always release flush() waiters, even when the write failed
+                    with self._all_done:
+                        self._unfinished -= end - start
+                        self._all_done.notify_all()
+                start = end
+
+# Level column text in the sessions table
+_LEVEL_ABBREV = {'child': "CHILD", 'normal': "NORMAL", 'academic': "ACADEMIC", None: "DEFAULT"}
+
+@functools.lru_cache(maxsize=1)
+def _get_console():
+    """Console shared by every SessionManager, created on first use"""
+    from rich.console import Console
+    return Console()
+
+def _make_sessions_table():
+    """Empty sessions table with its columns configured"""
+    from rich.table import Table
+    table = Table(show_header=True, header_style="white", border_style="white", box=None)
+    table.add_column("#", style="dim", width=3)
+    table.add_column("Title", style="white", min_width=20)
+    table.add_column("Level", style="cyan", width=10)
+    table.add_column("Messages", justify="center", width=8)
+    table.add_column("Last Active", style="dim", width=12)
+    table.add_column("ID", style="dim", width=10)
+    return table
+
+def _make_level_table():
+    """Empty academic level table with its columns configured"""
+    from rich.table import Table
+    table = Table(show_header=False, box=None, border_style="white")
+    table.add_column("Field", style="white", width=18)
+    table.add_column("Value", style="white")
+    return table
+
+def _make_panel(table, title: str):
+    """Titled white panel used around the session manager's tables"""
+    from rich.panel import Panel
+    return Panel.fit(table, title=f"[white]{title}[/white]", border_style="white", padding=(1, 2))
+
 class SessionManager:
     """Manages chat sessions and conversation history"""
     
+    # user_id -> (default academic level, expires at), shared by all managers in the process
+    _user_level_cache: Dict[int, Tuple[str, float]] = {}
+    
     def __init__(self, user_id: int):
         self.user_id = user_id
         self.database = get_database()
         self.ai_service = get_ai_service()
-        self.console = Console()
+        self.console = _get_console()
         
         # Current active session
         self.current_session = None
@@ -32,20 +160,60 @@ class SessionManager:
         self.max_context_tokens = 10000  # Token limit for context window
         self.context_display_limit = 5   # Message pairs to show on load
         
+        # Saves completed exchanges in the background, started on first use
+        self._writer = None
+        
+        # Primary keys of sessions already verified to belong to this user
+        self._owned_sessions: Dict[str, int] = {}
+        
+        # Last get_current_session_info result with the state it was built from
+        self._session_info_cache = None
+        
         # Load user's preferred academic level
         self._load_user_academic_level()
 
     def _load_user_academic_level(self):
         """Load user's preferred academic level from database"""
         try:
-            with self.database.get_session() as session:
-                user = session.query(User).filter(User.id == self.user_id).first()
-                if user:
-                    self.current_academic_level = user.get_academic_level()
+            self.current_academic_level = self._get_user_academic_level()
         except Exception as e:
             self.console.print(f"[dim bright_black]Warning: Could not load academic level: {e}[/dim bright_black]")
             self.current_academic_level = 'normal'
     
+    def _get_user_academic_level(self) -> str:
+        """Get the user's default academic level, cached for a few minutes"""
+        cached = self._user_level_cache.get(self.user_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        
+        with self.database.get_session() as session:
+            user = session.get(User, self.user_id)
+            level = user.get_academic_level() if user else 'normal'
+        
+        self._cache_user_academic_level(level)
+        return level
+    
+    def _cache_user_academic_level(self, level: str):
+        """Remember the user's default academic level"""
+        self._user_level_cache[self.user_id] = (level, time.monotonic() + _USER_LEVEL_TTL)
+    
+    def _find_owned_session(self, session, session_id: str, *options) -> ChatSession:
+        """ensure_user_owns_session, by primary key once the session has been verified (read-only)"""
+        pk = self._owned_sessions.get(session_id)
+        if pk is not None:
+            chat_session = session.get(ChatSession, pk, options=options)
+            if (chat_session is not None and chat_session.user_id == self.user_id
+                    and chat_session.session_id == session_id):
+                return chat_session
+        
+        return ensure_user_owns_session(session, session_id, self.user_id, *options)
+    
+    def _get_owned_session(self, session, session_id: str, *options) -> ChatSession:
+        """_find_owned_session, remembering the primary key for later lookups"""
+        chat_session = self._find_owned_session(session, session_id, *options)
+        self._owned_sessions[session_id] = chat_session.id
+        return chat_session
+    
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count for text (rough approximation)"""
         # Simple approximation: ~4 characters per token for English text
@@ -153,60 +321,46 @@ class SessionManager:
         else:
             return f"Mathematical discussion with {len(middle_messages)} message exchanges"
     
-    def _display_recent_context(self, session_id: str):
-        """Display recent context when loading a session"""
+    def _display_recent_context(self, all_messages: List[Message]):
+        """Display recent context when loading a session (messages in chronological order)"""
         try:
-            with self.database.get_session() as session:
-                # Get recent messages for display
-                messages = session.query(Message).filter(
-                    Message.chat_session_id == session.query(ChatSession).filter(
-                        ChatSession.session_id == session_id
-                    ).first().id
-                ).order_by(Message.timestamp.desc()).limit(self.context_display_limit * 2).all()
-                
-                if not messages:
-                    self.console.print("[dim]No previous messages in this session.[/dim]")
-                    return
-                
-                # Reverse to show chronological order
-                messages.reverse()
-                
-                self.console.print()
-                self.console.print("[white]Recent context:[/white]")
-                
-                # Group messages into pairs and display
-                for i in range(0, len(messages), 2):
-                    user_msg = messages[i] if i < len(messages) else None
-                    ai_msg = messages[i + 1] if i + 1 < len(messages) else None
-                    
-                    if user_msg and user_msg.role == 'user':
-                        timestamp = user_msg.timestamp.strftime("%H:%M")
-                        content = self._truncate_message(user_msg.content, 80)
-                        self.console.print(f"[dim]{timestamp}[/dim] [white]YOU:[/white] {content}")
-                    
-                    if ai_msg and ai_msg.role == 'assistant':
-                        timestamp = ai_msg.timestamp.strftime("%H:%M")
-                        content = self._truncate_message(ai_msg.content, 80)
-                        self.console.print(f"[dim]{timestamp}[/dim] [white]FAUST:[/white] {content}")
-                    
-                    if i + 2 < len(messages):  # Not the last pair
-                        self.console.print()
-                
-                # Check if there are older messages and show summary
-                total_messages = session.query(Message).filter(
-                    Message.chat_session_id == session.query(ChatSession).filter(
-                        ChatSession.session_id == session_id
-                    ).first().id
-                ).count()
-                
-                shown_messages = len(messages)
-                if total_messages > shown_messages:
-                    older_count = total_messages - shown_messages
+            messages = all_messages[-self.context_display_limit * 2:]
+            
+            if not messages:
+                self.console.print("[dim]No previous messages in this session.[/dim]")
+                return
+            
+            self.console.print()
+            self.console.print("[white]Recent context:[/white]")
+            
+            # Group messages into pairs and display
+            for i in range(0, len(messages), 2):
+                user_msg = messages[i] if i < len(messages) else None
+                ai_msg = messages[i + 1] if i + 1 < len(messages) else None
+                
+                if user_msg and user_msg.role == 'user':
+                    timestamp = user_msg.timestamp.strftime("%H:%M")
+                    content = self._truncate_message(user_msg.get_preview(), 80)
+                    self.console.print(f"[dim]{timestamp}[/dim] [white]YOU:[/white] {content}")
+                
+                if ai_msg and ai_msg.role == 'assistant':
+                    timestamp = ai_msg.timestamp.strftime("%H:%M")
+                    content = self._truncate_message(ai_msg.get_preview(), 80)
+                    self.console.print(f"[dim]{timestamp}[/dim] [white]FAUST:[/white] {content}")
+                
+                if i + 2 < len(messages):  # Not the last pair
                     self.console.print()
-                    self.console.print(f"[dim][Context from {older_count} earlier messages available][/dim]")
-                
+            
+            # Show a summary of older messages
+            total_messages = len(all_messages)
+            shown_messages = len(messages)
+            if total_messages > shown_messages:
+                older_count = total_messages - shown_messages
                 self.console.print()
-                
+                self.console.print(f"[dim][Context from {older_count} earlier messages available][/dim]")
+            
+            self.console.print()
+            
         except Exception as e:
             self.console.print(f"[dim bright_black]Could not load context: {e}[/dim bright_black]")
     
@@ -226,32 +380,36 @@ class SessionManager:
         level = level.lower()
         
         try:
-            with self.database.get_session() as session:
+            with self.database.get_session() as session, no_expire_on_commit(session):
                 if session_only and self.current_session_id:
                     # Set level for current session only
-                    chat_session = ensure_user_owns_session(session, self.current_session_id, self.user_id)
+                    chat_session = self._get_owned_session(session, self.current_session_id)
                     chat_session.set_session_academic_level(level)
                     session.commit()
                     
                     self.current_academic_level = level
-                    self.current_session = chat_session.to_dict(include_ai_context=True)
+                    self.current_session = chat_session.to_dict()
                     
                     level_info = self.ai_service.get_academic_level_info(level)
                     self.console.print(f"[white]✓ Session academic level set to: {level_info['name']}[/white]")
                     
                 else:
                     # Set level for user (affects all new sessions)
-                    user = session.query(User).filter(User.id == self.user_id).first()
+                    user = session.get(User, self.user_id)
                     if user:
                         user.set_academic_level(level)
-                        session.commit()
                     
-                    # Also update current session if exists
+                    # Also update current session if exists, in the same commit
+                    chat_session = None
                     if self.current_session_id:
-                        chat_session = ensure_user_owns_session(session, self.current_session_id, self.user_id)
+                        chat_session = self._get_owned_session(session, self.current_session_id)
                         chat_session.set_session_academic_level(level)
-                        session.commit()
-                        self.current_session = chat_session.to_dict(include_ai_context=True)
+                    
+                    session.commit()
+                    if user:
+                        self._cache_user_academic_level(level)
+                    if chat_session:
+                        self.current_session = chat_session.to_dict()
                     
                     self.current_academic_level = level
                     level_info = self.ai_service.get_academic_level_info(level)
@@ -275,10 +433,7 @@ class SessionManager:
         level_info = self.ai_service.get_academic_level_info(current_level)
         
         # Create info table
-        table = Table(show_header=False, box=None, border_style="white")
-        table.add_column("Field", style="white", width=18)
-        table.add_column("Value", style="white")
-        
+        table = _make_level_table()
         table.add_row("Current Level", f"{level_info['name']}")
         table.add_row("Description", level_info['description'])
         table.add_row("Complexity", level_info['complexity'])
@@ -291,19 +446,15 @@ class SessionManager:
         else:
             table.add_row("Scope", "User Default")
         
-        panel = Panel.fit(
-            table,
-            title="[white]ACADEMIC LEVEL SETTINGS[/white]",
-            border_style="white",
-            padding=(1, 2)
-        )
-        self.console.print(panel)
+        self.console.print(_make_panel(table, "ACADEMIC LEVEL SETTINGS"))
         self.console.print()
     
     def create_new_session(self, title: str = None, academic_level: str = None) -> str:
         """Create a new chat session with optional academic level"""
+        self.flush_writes()
+        
         try:
-            with self.database.get_session() as session:
+            with self.database.get_session() as session, no_expire_on_commit(session):
                 # Create new chat session
                 session_id = str(uuid.uuid4())
                 chat_session = ChatSession(
@@ -321,8 +472,9 @@ class SessionManager:
                 
                 # Set as current session
                 self.current_session_id = session_id
-                self.current_session = chat_session.to_dict(include_ai_context=True)
+                self.current_session = chat_session.to_dict()
                 self.chat_history = []
+                self._owned_sessions[session_id] = chat_session.id
                 
                 # Update current academic level
                 effective_level = chat_session.get_effective_academic_level(self.current_academic_level)
@@ -338,25 +490,33 @@ class SessionManager:
     
     def load_session(self, session_id: str) -> bool:
         """Load an existing chat session and display recent context"""
+        self.flush_writes()
+        
         try:
-            with self.database.get_session() as db_session:
-                chat_session = ensure_user_owns_session(db_session, session_id, self.user_id)
+            with self.database.get_session() as db_session, no_expire_on_commit(db_session):
+                # Session row plus all of its messages in two queries; the recent
+                # context below is sliced from the same list
+                chat_session = self._get_owned_session(
+                    db_session, session_id,
+                    selectinload(ChatSession.messages).options(undefer(Message.content))
+                )
+                raw_context = chat_session.get_ai_context()
                 
-                # Update last active
-                chat_session.last_active = datetime.utcnow()
-                db_session.commit()
+                # Update last active, unless the session was touched moments ago
+                last_active = chat_session.last_active
+                if last_active is None or (datetime.utcnow() - last_active).total_seconds() >= _LAST_ACTIVE_DEBOUNCE:
+                    chat_session.last_active = datetime.utcnow()
+                    db_session.commit()
                 
                 # Set as current session
                 self.current_session_id = session_id
-                self.current_session = chat_session.to_dict(include_ai_context=True)
+                self.current_session = chat_session.to_dict()
                 
                 # Load and manage AI context
-                raw_context = chat_session.get_ai_context()
                 self.chat_history = self._manage_context_window(raw_context)
                 
                 # Get effective academic level for this session
-                user = db_session.query(User).filter(User.id == self.user_id).first()
-                user_level = user.get_academic_level() if user else 'normal'
+                user_level = self._get_user_academic_level()
                 effective_level = chat_session.get_effective_academic_level(user_level)
                 self.current_academic_level = effective_level
                 
@@ -366,7 +526,7 @@ class SessionManager:
                 self.console.print(f"[white]✓ Loaded session: {chat_session.title} ({message_count} messages, {level_info['name']})[/white]")
                 
                 # Display recent context automatically
-                self._display_recent_context(session_id)
+                self._display_recent_context(chat_session.messages)
                 
                 return True
                 
@@ -375,20 +535,50 @@ class SessionManager:
             return False
     
     def list_sessions(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """List user's chat sessions"""
+        """List user's chat sessions (only the columns the session listings show)"""
         try:
             with self.database.get_session() as session:
-                chat_sessions = session.query(ChatSession).filter(
+                rows = session.query(
+                    ChatSession.session_id,
+                    ChatSession.title,
+                    ChatSession.session_academic_level,
+                    ChatSession.message_count,
+                    ChatSession.last_active
+                ).filter(
                     ChatSession.user_id == self.user_id,
                     ChatSession.is_archived == False
                 ).order_by(ChatSession.last_active.desc()).limit(limit).all()
                 
-                return [cs.to_dict() for cs in chat_sessions]
+                return [
+                    {
+                        'session_id': row.session_id,
+                        'title': row.title,
+                        'session_academic_level': row.session_academic_level.value if row.session_academic_level else None,
+                        'message_count': row.message_count,
+                        'last_active': row.last_active.isoformat() if row.last_active else None,
+                        # Unix time of last activity, so callers can compute ages without parsing
+                        'last_active_epoch': calendar.timegm(row.last_active.utctimetuple()) if row.last_active else None
+                    }
+                    for row in rows
+                ]
                 
         except SQLAlchemyError as e:
             self.console.print(f"[bright_red]✗ Failed to list sessions: {e}[/bright_red]")
             return []
     
+    def get_latest_session_id(self) -> Optional[str]:
+        """Get the ID of the user's most recently active session, if any"""
+        try:
+            with self.database.get_session() as session:
+                return session.query(ChatSession.session_id).filter(
+                    ChatSession.user_id == self.user_id,
+                    ChatSession.is_archived == False
+                ).order_by(ChatSession.last_active.desc()).limit(1).scalar()
+                
+        except SQLAlchemyError as e:
+            self.console.print(f"[bright_red]✗ Failed to list sessions: {e}[/bright_red]")
+            return None
+    
     def show_sessions_table(self):
         """Display sessions with academic level information"""
         sessions = self.list_sessions()
@@ -397,29 +587,17 @@ class SessionManager:
             self.console.print("[dim]No chat sessions found. Use /new to create one.[/dim]")
             return
         
-        table = Table(show_header=True, header_style="white", border_style="white", box=None)
-        table.add_column("#", style="dim", width=3)
-        table.add_column("Title", style="white", min_width=20)
-        table.add_column("Level", style="cyan", width=10)
-        table.add_column("Messages", justify="center", width=8)
-        table.add_column("Last Active", style="dim", width=12)
-        table.add_column("ID", style="dim", width=10)
+        table = _make_sessions_table()
         
+        now = time.time()
         for i, session_data in enumerate(sessions, 1):
             # Format last active time
-            last_active = datetime.fromisoformat(session_data['last_active'])
-            time_diff = datetime.utcnow() - last_active
-            
-            if time_diff.days > 0:
-                time_str = f"{time_diff.days}d ago"
-            elif time_diff.seconds > 3600:
-                hours = time_diff.seconds // 3600
-                time_str = f"{hours}h ago"
-            elif time_diff.seconds > 60:
-                minutes = time_diff.seconds // 60
-                time_str = f"{minutes}m ago"
-            else:
-                time_str = "now"
+            elapsed = int(now - (session_data['last_active_epoch'] or now))
+            time_str = "now"
+            for threshold, unit_seconds, suffix in _AGE_UNITS:
+                if elapsed > threshold:
+                    time_str = f"{elapsed // unit_seconds}{suffix} ago"
+                    break
             
             # Current session indicator
             title = session_data['title']
@@ -427,11 +605,8 @@ class SessionManager:
                 title = f"[white]→ {title}[/white]"
             
             # Academic level display
-            session_level = session_data.get('session_academic_level')
-            if session_level:
-                level_display = session_level.upper()
-            else:
-                level_display = "DEFAULT"
+            session_level = session_data.get('session_academic_level') or None
+            level_display = _LEVEL_ABBREV.get(session_level) or session_level.upper()
             
             table.add_row(
                 str(i),
@@ -442,13 +617,7 @@ class SessionManager:
                 session_data['session_id'][:8]
             )
         
-        panel = Panel.fit(
-            table,
-            title="[white]MATH SESSIONS[/white]",
-            border_style="white",
-            padding=(1, 2)
-        )
-        self.console.print(panel)
+        self.console.print(_make_panel(table, "MATH SESSIONS"))
         self.console.print()
     
     def send_message_stream(self, message: str):
@@ -501,64 +670,93 @@ class SessionManager:
     
     def _save_message_to_db(self, user_message: str, ai_response: str, tokens_used: int = None, response_time: int = None):
         """Save conversation messages to database with context management"""
+        self.queue_exchange(user_message, ai_response, tokens_used, response_time)
+    
+    def queue_exchange(self, user_message: str, ai_response: str, tokens_used: Optional[int] = None,
+                       response_time: Optional[int] = None):
+        """Queue an exchange of the current session for the background writer"""
+        if self._writer is None:
+            self._writer = MessageWriter(self._write_exchanges)
+        else:
+            self._apply_writer_results()
+        self._writer.enqueue(self.current_session_id, (user_message, ai_response, tokens_used, response_time))
+    
+    def flush_writes(self):
+        """Wait until all queued exchanges are in the database"""
+        if self._writer is not None:
+            if not self._writer.flush():
+                self.console.print("[dim]Still saving earlier messages in the background...[/dim]")
+            self._apply_writer_results()
+    
+    def _apply_writer_results(self):
+        """Take over what the background writer saved (or failed to save) since the last call"""
+        saved, errors = self._writer.take_results()
+        for session_id, session_data in saved.items():
+            self._apply_saved_session(session_id, session_data)
+        for error in errors:
+            self.console.print(f"[bright_red]✗ Failed to save to database: {error}[/bright_red]")
+    
+    def _apply_saved_session(self, session_id: str, session_data: Dict[str, Any]):
+        """Refresh local state from a session returned by _write_exchanges"""
+        if session_id == self.current_session_id:
+            self.current_session = session_data
+    
+    def save_messages_batch(self, exchanges: List[Tuple[str, str, Optional[int], Optional[int]]],
+                            session_id: Optional[str] = None):
+        """Save several (user message, AI response, tokens, response ms) exchanges in one transaction"""
+        if not exchanges:
+            return
+        
+        session_id = session_id or self.current_session_id
         try:
-            with self.database.get_session() as session:
-                chat_session = ensure_user_owns_session(session, self.current_session_id, self.user_id)
-                
-                # Save user message
-                user_msg = Message(
-                    chat_session_id=chat_session.id,
-                    role="user",
-                    content=user_message
-                )
-                session.add(user_msg)
-                
-                # Save AI response
-                ai_msg = Message(
-                    chat_session_id=chat_session.id,
-                    role="assistant",
-                    content=ai_response,
-                    tokens_used=tokens_used,
-                    response_time_ms=response_time
-                )
-                session.add(ai_msg)
-                
-                # Update session
-                chat_session.message_count += 2
-                chat_session.last_active = datetime.utcnow()
-                
-                # Store managed context (not raw chat history)
-                managed_context = self._manage_context_window(self.chat_history)
-                chat_session.store_ai_context(managed_context)
-                
-                # Auto-generate title for first message
-                if chat_session.message_count == 2 and chat_session.title == "New Math Session":
-                    new_title = self._generate_title_from_message(user_message)
-                    chat_session.title = new_title
-                
-                session.commit()
-                
-                # Update local state
-                self.current_session = chat_session.to_dict(include_ai_context=True)
-                
+            self._apply_saved_session(session_id, self._write_exchanges(exchanges, session_id))
         except Exception as e:
             self.console.print(f"[bright_red]✗ Failed to save to database: {e}[/bright_red]")
     
+    def _write_exchanges(self, exchanges: List[Tuple[str, str, Optional[int], Optional[int]]],
+                         session_id: str) -> Dict[str, Any]:
+        """Store exchanges in one transaction and return the session's new state (leaves manager state alone)"""
+        with self.database.get_session() as session, no_expire_on_commit(session):
+            chat_session = self._find_owned_session(session, session_id)
+            is_first_exchange = chat_session.message_count == 0
+            
+            rows = []
+            for user_message, ai_response, tokens_used, response_time in exchanges:
+                rows.append({'role': "user", 'content': user_message})
+                rows.append({
+                    'role': "assistant",
+                    'content': ai_response,
+                    'tokens_used': tokens_used,
+                    'response_time_ms': response_time
+                })
+            bulk_add_messages(session, chat_session.id, rows)
+            
+            # Update session (last_active is bumped on update)
+            chat_session.message_count += 2 * len(exchanges)
+            
+            # Auto-generate title for first message
+            if is_first_exchange and chat_session.title == "New Math Session":
+                chat_session.title = self._generate_title_from_message(exchanges[0][0])
+            
+            session.commit()
+            return chat_session.to_dict()
+    
     def rename_session(self, new_title: str) -> bool:
         """Rename the current session"""
+        self.flush_writes()
+        
         if not self.current_session_id:
             self.console.print("[bright_red]✗ No active session to rename[/bright_red]")
             return False
         
         try:
-            with self.database.get_session() as session:
-                chat_session = ensure_user_owns_session(session, self.current_session_id, self.user_id)
+            with self.database.get_session() as session, no_expire_on_commit(session):
+                chat_session = self._get_owned_session(session, self.current_session_id)
                 chat_session.title = new_title
-                chat_session.last_active = datetime.utcnow()
                 session.commit()
                 
                 # Update local state
-                self.current_session = chat_session.to_dict(include_ai_context=True)
+                self.current_session = chat_session.to_dict()
                 
                 self.console.print(f"[white]✓ Session renamed to: {new_title}[/white]")
                 return True
@@ -569,6 +767,8 @@ class SessionManager:
     
     def delete_session(self, session_id: str = None) -> bool:
         """Delete a session (current session if no ID provided)"""
+        self.flush_writes()
+        
         target_session_id = session_id or self.current_session_id
         
         if not target_session_id:
@@ -576,10 +776,20 @@ class SessionManager:
             return False
         
         try:
-            with self.database.get_session() as session:
-                chat_session = ensure_user_owns_session(session, target_session_id, self.user_id)
-                session.delete(chat_session)
+            with self.database.get_session() as session, no_expire_on_commit(session):
+                chat_session = self._get_owned_session(session, target_session_id)
+                
+                # Bulk deletes, so the messages never have to be loaded for the ORM cascade
+                session.execute(
+                    delete(Message).where(Message.chat_session_id == chat_session.id),
+                    execution_options={'synchronize_session': False}
+                )
+                session.execute(
+                    delete(ChatSession).where(ChatSession.id == chat_session.id),
+                    execution_options={'synchronize_session': False}
+                )
                 session.commit()
+                self._owned_sessions.pop(target_session_id, None)
                 
                 # If deleting current session, clear it
                 if target_session_id == self.current_session_id:
@@ -596,28 +806,30 @@ class SessionManager:
     
     def clear_current_session(self) -> bool:
         """Clear messages from current session"""
+        self.flush_writes()
+        
         if not self.current_session_id:
             self.console.print("[bright_red]✗ No active session to clear[/bright_red]")
             return False
         
         try:
-            with self.database.get_session() as session:
-                chat_session = ensure_user_owns_session(session, self.current_session_id, self.user_id)
+            with self.database.get_session() as session, no_expire_on_commit(session):
+                chat_session = self._get_owned_session(session, self.current_session_id)
                 
-                # Delete all messages
-                session.query(Message).filter(
-                    Message.chat_session_id == chat_session.id
-                ).delete()
+                # Delete all messages in one statement, without syncing them into the session
+                session.execute(
+                    delete(Message).where(Message.chat_session_id == chat_session.id),
+                    execution_options={'synchronize_session': False}
+                )
                 
-                # Clear AI context and reset counters
-                chat_session.clear_ai_context()
+                # Reset counters (the AI context is rebuilt from messages)
                 chat_session.message_count = 0
                 chat_session.last_active = datetime.utcnow()
                 
                 session.commit()
                 
                 # Update local state
-                self.current_session = chat_session.to_dict(include_ai_context=True)
+                self.current_session = chat_session.to_dict()
                 self.chat_history = []
                 
                 self.console.print("[white]✓ Session cleared[/white]")
@@ -627,20 +839,46 @@ class SessionManager:
             self.console.print(f"[bright_red]✗ Failed to clear session: {e}[/bright_red]")
             return False
     
-    def get_session_history(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get message history for current session"""
+    def get_session_history(self, limit: int = 50, include_content: bool = True) -> List[Dict[str, Any]]:
+        """Get message history for current session (previews only unless include_content)"""
         if not self.current_session_id:
             return []
         
         try:
             with self.database.get_session() as session:
-                chat_session = ensure_user_owns_session(session, self.current_session_id, self.user_id)
+                chat_session = self._get_owned_session(session, self.current_session_id)
                 
-                messages = session.query(Message).filter(
+                if include_content:
+                    messages = session.query(Message).options(undefer(Message.content)).filter(
+                        Message.chat_session_id == chat_session.id
+                    ).order_by(Message.timestamp.asc()).limit(limit).all()
+                    
+                    return [msg.to_dict() for msg in messages]
+                
+                # Previews only: the database truncates rows saved before previews existed
+                rows = session.query(
+                    Message.id,
+                    Message.role,
+                    func.coalesce(Message.content_preview, func.substr(Message.content, 1, 200)).label('content_preview'),
+                    Message.timestamp,
+                    Message.tokens_used,
+                    Message.response_time_ms
+                ).filter(
                     Message.chat_session_id == chat_session.id
                 ).order_by(Message.timestamp.asc()).limit(limit).all()
                 
-                return [msg.to_dict() for msg in messages]
+                return [
+                    {
+                        'id': row.id,
+                        'chat_session_id': chat_session.id,
+                        'role': row.role,
+                        'content_preview': row.content_preview,
+                        'timestamp': row.timestamp.isoformat() if row.timestamp else None,
+                        'tokens_used': row.tokens_used,
+                        'response_time_ms': row.response_time_ms
+                    }
+                    for row in rows
+                ]
                 
         except (SQLAlchemyError, ValueError) as e:
             self.console.print(f"[bright_red]✗ Failed to get history: {e}[/bright_red]")
@@ -652,7 +890,7 @@ class SessionManager:
             self.console.print("[dim]No active session. Start a conversation first.[/dim]")
             return
         
-        history = self.get_session_history(limit)
+        history = self.get_session_history(limit, include_content=False)
         
         if not history:
             self.console.print("[dim]No message history in current session.[/dim]")
@@ -665,8 +903,8 @@ class SessionManager:
             role_prefix = "YOU" if msg['role'] == "user" else "FAUST"
             role_style = "white" if msg['role'] == "user" else "white"
             
-            content_preview = msg['content'][:80]
-            if len(msg['content']) > 80:
+            content_preview = msg['content_preview'][:80]
+            if len(msg['content_preview']) > 80:
                 content_preview += "..."
             
             self.console.print(f"[dim]{timestamp}[/dim] [{role_style}]{role_prefix}:[/{role_style}] {content_preview}")
@@ -676,7 +914,7 @@ class SessionManager:
     def _generate_title_from_message(self, message: str) -> str:
         """Generate a title from the first user message"""
         # Take first 4-6 words, max 35 characters
-        words = message.split()
+        words = message.split(maxsplit=6)
         title = " ".join(words[:6])
         
         if len(title) > 35:
@@ -686,6 +924,9 @@ class SessionManager:
     
     def get_current_session_info(self) -> Dict[str, Any]:
         """Get information about current session including academic level"""
+        if self._writer is not None:
+            self._apply_writer_results()
+        
         if not self.current_session:
             return {
                 'active': False,
@@ -693,9 +934,17 @@ class SessionManager:
             }
         
         current_level = self.get_current_academic_level()
+        
+        # current_session and chat_history are replaced, never edited in place, so
+        # identity tells whether the cached info is still current
+        cached = self._session_info_cache
+        if (cached is not None and cached[0] is self.current_session
+                and cached[1] == current_level and cached[2] is self.chat_history):
+            return cached[3]
+        
         level_info = self.ai_service.get_academic_level_info(current_level)
         
-        return {
+        info = {
             'active': True,
             'session_id': self.current_session_id,
             'title': self.current_session['title'],
@@ -707,6 +956,8 @@ class SessionManager:
             'context_tokens': self._count_context_tokens(self.chat_history),
             'max_tokens': self.max_context_tokens
         }
+        self._session_info_cache = (self.current_session, current_level, self.chat_history, info)
+        return info
 
 def create_session_manager(user_id: int) -> SessionManager:
     """Create a new session manager for a user"""
@@ -0,0 +1,31 @@
+import sqlite3
+
+import pytest
+
+import faust.config
+import faust.database
+from faust.database import get_database
+
+
+def open_database(tmp_path, monkeypatch, schema=None):
+    """Point the app at a fresh home directory, optionally seeded with a schema, and open its database"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(faust.config, '_config', None)
+    monkeypatch.setattr(faust.database, '_database', None)
+    
+    if schema:
+        app_dir = tmp_path / '.faust'
+        app_dir.mkdir()
+        connection = sqlite3.connect(app_dir / 'faust.db')
+        connection.executescript(schema)
+        connection.close()
+    
+    return get_database()
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Database created by the current code"""
+    database = open_database(tmp_path, monkeypatch)
+    yield database
+    database.engine.dispose()
@@ -0,0 +1,207 @@
+from unittest import mock
+
+import pytest
+
+import faust.database
+from faust.database import ChatSession, Message, User, create_user, update_preference
+
+from conftest import open_database
+
+# Schema written by the original release, before any migrations
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL,
+    username VARCHAR(50) NOT NULL,
+    email VARCHAR(255),
+    password_hash VARCHAR(255) NOT NULL,
+    display_name VARCHAR(100),
+    is_active BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    last_active DATETIME NOT NULL,
+    last_login DATETIME,
+    academic_level VARCHAR(8) NOT NULL,
+    preferences JSON,
+    PRIMARY KEY (id),
+    UNIQUE (username),
+    UNIQUE (email)
+);
+CREATE INDEX idx_last_active ON users (last_active);
+CREATE INDEX idx_username ON users (username);
+CREATE INDEX idx_email ON users (email);
+CREATE TABLE chat_sessions (
+    id INTEGER NOT NULL,
+    session_id VARCHAR(36) NOT NULL,
+    user_id INTEGER NOT NULL,
+    title VARCHAR(500) NOT NULL,
+    message_count INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    last_active DATETIME NOT NULL,
+    ai_context JSON,
+    is_archived BOOLEAN NOT NULL,
+    session_academic_level VARCHAR(8),
+    PRIMARY KEY (id),
+    UNIQUE (session_id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX idx_session_id ON chat_sessions (session_id);
+CREATE INDEX idx_user_sessions ON chat_sessions (user_id, last_active);
+CREATE INDEX idx_archived ON chat_sessions (is_archived);
+CREATE TABLE messages (
+    id INTEGER NOT NULL,
+    chat_session_id INTEGER NOT NULL,
+    role VARCHAR(20) NOT NULL,
+    content TEXT NOT NULL,
+    timestamp DATETIME NOT NULL,
+    tokens_used INTEGER,
+    response_time_ms INTEGER,
+    PRIMARY KEY (id),
+    FOREIGN KEY(chat_session_id) REFERENCES chat_sessions (id)
+);
+CREATE INDEX idx_role ON messages (role);
+CREATE INDEX idx_session_messages ON messages (chat_session_id, timestamp);
+"""
+
+
+@pytest.fixture
+def baseline_database(tmp_path, monkeypatch):
+    """Database opened by the current code on top of a baseline-schema file"""
+    database = open_database(tmp_path, monkeypatch, BASELINE_SCHEMA)
+    yield database
+    database.engine.dispose()
+
+
+def test_baseline_database_accepts_new_rows(baseline_database):
+    with baseline_database.get_session() as session:
+        user = create_user(session, 'alice', 'correct horse battery')
+        assert user.created_at is not None
+        
+        chat_session = ChatSession(session_id='0' * 36, user_id=user.id, title='Limits')
+        session.add(chat_session)
+        session.commit()
+        assert chat_session.created_at is not None
+        assert chat_session.last_active is not None
+        
+        session.add(Message(chat_session_id=chat_session.id, role='user', content='What is a limit?'))
+        session.commit()
+        assert session.query(Message).count() == 1
+
+
+def test_update_preference_sqlite_json_set(database):
+    with database.get_session() as session:
+        user = create_user(session, 'alice', 'correct horse battery')
+        assert user.preferences['theme'] == 'dark'
+        
+        update_preference(session, user.id, 'theme', 'light')
+        session.commit()
+        
+        # The loaded user is expired rather than left with stale preferences
+        assert user.preferences['theme'] == 'light'
+        assert user.preferences['math_display'] == 'unicode'
+    
+    with database.get_session() as session:
+        assert session.get(User, user.id).preferences['theme'] == 'light'
+
+
+def test_update_preference_orm_fallback_for_quoted_keys(database):
+    with database.get_session() as session:
+        user_id = create_user(session, 'alice', 'correct horse battery').id
+        
+        update_preference(session, user_id, 'say "hi"', {'enabled': True})
+        session.commit()
+    
+    with database.get_session() as session:
+        preferences = session.get(User, user_id).preferences
+        assert preferences['say "hi"'] == {'enabled': True}
+        assert preferences['theme'] == 'dark'
+
+
+def test_update_preference_postgresql_jsonb_set():
+    session = mock.MagicMock()
+    session.get_bind.return_value.dialect.name = 'postgresql'
+    session.identity_map.get.return_value = None
+    
+    update_preference(session, 7, 'theme', 'light')
+    
+    statement, params = session.execute.call_args.args
+    assert 'jsonb_set' in str(statement)
+    assert params == {'path': '{"theme"}', 'value': '"light"', 'user_id': 7}
+
+
+def test_create_tables_migrates_postgresql_column_types():
+    from sqlalchemy import VARCHAR
+    from sqlalchemy.dialects.postgresql import JSON
+    
+    database = faust.database.Database.__new__(faust.database.Database)
+    database.engine = mock.MagicMock()
+    database.engine.dialect.name = 'postgresql'
+    inspector = mock.MagicMock()
+    inspector.get_columns.side_effect = {
+        'messages': [{'name': 'content_preview', 'type': VARCHAR(200)}],
+        'chat_sessions': [{'name': 'session_id', 'type': VARCHAR(36)}],
+        'users': [{'name': 'preferences', 'type': JSON()}],
+    }.get
+    
+    with mock.patch.object(faust.database, 'inspect', return_value=inspector), \
+            mock.patch.object(faust.database.Base.metadata, 'create_all'), \
+            mock.patch.object(faust.database.Index, 'create'):
+        database.create_tables()
+    
+    connection = database.engine.begin.return_value.__enter__.return_value
+    statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+    assert "ALTER TABLE chat_sessions ALTER COLUMN session_id TYPE uuid USING session_id::uuid" in statements
+    assert "ALTER TABLE users ALTER COLUMN preferences TYPE jsonb USING preferences::jsonb" in statements
+
+
+def test_user_last_active_ignores_profile_changes(database):
+    with database.get_session() as session:
+        user = create_user(session, 'alice', 'correct horse battery')
+        last_active = user.last_active
+        
+        user.set_academic_level('academic')
+        session.commit()
+        assert user.last_active == last_active
+
+
+def test_session_last_active_orders_updates_within_a_second(database):
+    with database.get_session() as session:
+        user_id = create_user(session, 'alice', 'correct horse battery').id
+        older = ChatSession(session_id='1' * 36, user_id=user_id, title='Older')
+        newer = ChatSession(session_id='2' * 36, user_id=user_id, title='Newer')
+        session.add_all([older, newer])
+        session.commit()
+        
+        older.title = 'Renamed'
+        session.commit()
+        
+        latest = session.query(ChatSession.title).order_by(ChatSession.last_active.desc()).first()
+        assert latest.title == 'Renamed'
+
+
+
+def test_sqlite_server_default_keeps_subsecond_precision(database):
+    with database.engine.connect() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (username, password_hash, is_active, academic_level) "
+            "VALUES ('raw', 'x', 1, 'NORMAL')"
+        )
+        created_at = connection.exec_driver_sql("SELECT created_at FROM users WHERE username = 'raw'").scalar()
+    
+    # strftime('%f') form, e.g. 2026-01-01 12:00:00.123
+    assert len(created_at) == 23 and created_at[19] == '.'
+
+
+def test_baseline_messages_get_previews(tmp_path, monkeypatch):
+    # A message saved by the original release, before previews existed
+    seeded = BASELINE_SCHEMA + """
+    INSERT INTO users VALUES (1, 'alice', NULL, 'x', 'alice', 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00',
+                              NULL, 'NORMAL', '{}');
+    INSERT INTO chat_sessions VALUES (1, '0000', 1, 'Old', 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00',
+                                      NULL, 0, NULL);
+    INSERT INTO messages VALUES (1, 1, 'user', '""" + 'x' * 500 + """', '2024-01-01 00:00:00', NULL, NULL);
+    """
+    database = open_database(tmp_path, monkeypatch, seeded)
+    try:
+        with database.get_session() as session:
+            assert session.query(Message.content_preview).scalar() == 'x' * 200
+    finally:
+        database.engine.dispose()
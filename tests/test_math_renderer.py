@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from faust.math_renderer import MathRenderer
+
+
+def _stream(renderer, text, cuts):
+    """Feed text to render_incremental in pieces split at cuts, then render the carry"""
+    rendered, carry = "", ""
+    previous = 0
+    for cut in list(cuts) + [len(text)]:
+        rendered, carry = renderer.render_incremental(rendered, text[previous:cut], carry)
+        previous = cut
+    return rendered + renderer.render(carry)
+
+
+@pytest.fixture
+def renderer():
+    return MathRenderer()
+
+
+@pytest.mark.parametrize("text", [
+    "Solve $x^2 + 1 = 0$ for $x",                          # unclosed $
+    "Display $$\\frac{1}{2}$$ then $$y^2",                 # $$ and an unclosed $$
+    "Then \\begin{equation}a^2 + b^2\\end{equation} done",  # environment split anywhere
+    "Open \\begin{equation}x_1 and never closed",
+    "$$^2 \\\\begin{equation}\\alpha$$\\end{equation}",     # stray backslash inside math
+    "\\begin{equation}^2$b^2\\$$\\end{equation}^2 \\$",     # tokens formed across converted math
+])
+def test_every_split_matches_one_shot_render(renderer, text):
+    expected = renderer.render(text)
+    for cut in range(len(text) + 1):
+        assert _stream(renderer, text, [cut]) == expected
+    assert _stream(renderer, text, range(1, len(text))) == expected
+
+
+def test_random_splits_match_one_shot_render(renderer):
+    atoms = ['$', '$$', 'x', ' ', '^2', '\\alpha', '\\', '\\begin{equation}', '\\end{equation}',
+             '\\frac{1}{2}', '{', '}', '\n', 'b']
+    rng = random.Random(1234)
+    for _ in range(3000):
+        text = ''.join(rng.choice(atoms) for _ in range(rng.randint(1, 20)))
+        cuts = sorted(rng.sample(range(1, len(text)), min(rng.randint(0, 6), len(text) - 1)))
+        assert _stream(renderer, text, cuts) == renderer.render(text), (text, cuts)
+
+
+def test_plain_text_is_not_held_back(renderer):
+    rendered, carry = renderer.render_incremental("", "No math here, ")
+    assert (rendered, carry) == ("No math here, ", "")
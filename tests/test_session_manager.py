@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+import faust.session_manager
+from faust.ai_service import FaustAI
+from faust.database import create_user
+from faust.session_manager import MessageWriter, SessionManager
+
+
+class RecordingWrite:
+    """Write callable that records each call and the thread it ran on"""
+    
+    def __init__(self, error: Exception = None):
+        self.calls = []
+        self.error = error
+    
+    def __call__(self, exchanges, session_id):
+        self.calls.append((session_id, list(exchanges), threading.current_thread()))
+        if self.error:
+            raise self.error
+        return {'session_id': session_id, 'message_count': 2 * len(exchanges)}
+
+
+def _exchange(i):
+    return (f"question {i}", f"answer {i}", None, None)
+
+
+def test_writer_flushes_a_full_batch_without_waiting_for_the_interval(monkeypatch):
+    monkeypatch.setattr(faust.session_manager, '_WRITE_INTERVAL', 30.0)
+    write = RecordingWrite()
+    writer = MessageWriter(write)
+    
+    for i in range(faust.session_manager._WRITE_BATCH_SIZE):
+        writer.enqueue('s1', _exchange(i))
+    
+    assert writer.flush(timeout=5.0)
+    assert [len(exchanges) for _, exchanges, _ in write.calls] == [faust.session_manager._WRITE_BATCH_SIZE]
+
+
+def test_writer_flushes_a_partial_batch_after_the_interval(monkeypatch):
+    monkeypatch.setattr(faust.session_manager, '_WRITE_INTERVAL', 0.05)
+    write = RecordingWrite()
+    writer = MessageWriter(write)
+    
+    started = time.monotonic()
+    for i in range(3):
+        writer.enqueue('s1', _exchange(i))
+    
+    assert writer.flush(timeout=5.0)
+    assert time.monotonic() - started < 5.0
+    assert [len(exchanges) for _, exchanges, _ in write.calls] == [3]
+
+
+def test_writer_groups_consecutive_exchanges_per_session(monkeypatch):
+    monkeypatch.setattr(faust.session_manager, '_WRITE_INTERVAL', 0.05)
+    write = RecordingWrite()
+    writer = MessageWriter(write)
+    
+    for session_id in ('s1', 's1', 's2'):
+        writer.enqueue(session_id, _exchange(0))
+    
+    assert writer.flush(timeout=5.0)
+    assert [(session_id, len(exchanges)) for session_id, exchanges, _ in write.calls] == [('s1', 2), ('s2', 1)]
+
+
+def test_flush_returns_after_a_failed_write(monkeypatch):
+    monkeypatch.setattr(faust.session_manager, '_WRITE_INTERVAL', 0.01)
+    writer = MessageWriter(RecordingWrite(error=RuntimeError("database is locked")))
+    
+    writer.enqueue('s1', _exchange(0))
+    assert writer.flush(timeout=5.0)
+    assert writer.take_results() == ({}, ["database is locked"])
+    
+    # The thread survived and keeps serving later writes
+    writer.enqueue('s1', _exchange(1))
+    assert writer.flush(timeout=5.0)
+
+
+def test_flush_gives_up_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(faust.session_manager, '_WRITE_INTERVAL', 0.01)
+    release = threading.Event()
+    writer = MessageWriter(lambda exchanges, session_id: release.wait() and {})
+    
+    writer.enqueue('s1', _exchange(0))
+    assert not writer.flush(timeout=0.05)
+    
+    release.set()
+    assert writer.flush(timeout=5.0)
+
+
+class StubAI:
+    """Just enough of the AI service for a SessionManager"""
+    
+    def get_academic_level_info(self, level):
+        return FaustAI.get_academic_level_info(self, level)
+
+
+@pytest.fixture
+def manager(database, monkeypatch):
+    monkeypatch.setattr(faust.session_manager, 'get_ai_service', StubAI)
+    monkeypatch.setattr(faust.session_manager, '_WRITE_INTERVAL', 0.01)
+    with database.get_session() as session:
+        user_id = create_user(session, 'alice', 'correct horse battery').id
+    
+    manager = SessionManager(user_id)
+    manager.create_new_session()
+    return manager
+
+
+def test_writer_results_are_applied_on_the_main_thread(manager, monkeypatch):
+    write_threads = []
+    write_exchanges = manager._write_exchanges
+    monkeypatch.setattr(manager, '_write_exchanges', lambda *args: write_threads.append(threading.current_thread()) or write_exchanges(*args))
+    
+    applied_threads = []
+    apply_saved_session = manager._apply_saved_session
+    monkeypatch.setattr(manager, '_apply_saved_session', lambda *args: applied_threads.append(threading.current_thread()) or apply_saved_session(*args))
+    
+    manager.queue_exchange("What is 2+2?", "4")
+    manager._writer.flush(timeout=5.0)
+    
+    # Written on the writer thread, but the manager's state is untouched until the main thread takes it over
+    assert write_threads and threading.main_thread() not in write_threads
+    assert applied_threads == []
+    assert manager.current_session['message_count'] == 0
+    
+    manager.flush_writes()
+    assert applied_threads == [threading.main_thread()]
+    assert manager.current_session['message_count'] == 2
+    assert manager.current_session['title'] == "What is 2+2?"